@@ -0,0 +1,43 @@
+"""
+包级延迟导出
+
+为包的 __init__ 生成模块级 __getattr__ / __dir__（PEP 562），
+导出名称在首次访问时才导入所在子模块。
+"""
+
+import sys
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str,
+    exports: Dict[str, str],
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    生成延迟导出所需的 __getattr__ 和 __dir__
+
+    使用示例:
+        __getattr__, __dir__ = lazy_exports(__name__, {"DataAgent": ".deep_agent"})
+
+    Args:
+        package: 包名，通常传入 __name__
+        exports: 导出名称 -> 所在子模块（相对导入路径）
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    namespace = sys.modules[package].__dict__
+
+    def module_getattr(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value  # 缓存，后续访问不再经过 __getattr__
+        return value
+
+    def module_dir():
+        return sorted(set(namespace) | set(exports))
+
+    return module_getattr, module_dir
@@ -1,9 +1,26 @@
-"""Agent 核心模块"""
+"""Agent 核心模块
 
-from .deep_agent import DataAgent
-from .llm import create_llm, ChatModel, get_llm, get_streaming_llm
-from .plan_executor import PlanExecutor, ExecutionPlan, PlanStep, StepStatus
-from .compactor import ConversationCompactor
+子模块在首次访问对应名称时才导入，使只用到 plan_executor 等轻量模块时
+不必加载 langchain。
+"""
+
+from .._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块
+_EXPORTS = {
+    "DataAgent": ".deep_agent",
+    "create_llm": ".llm",
+    "ChatModel": ".llm",
+    "get_llm": ".llm",
+    "get_streaming_llm": ".llm",
+    "PlanExecutor": ".plan_executor",
+    "ExecutionPlan": ".plan_executor",
+    "PlanStep": ".plan_executor",
+    "StepStatus": ".plan_executor",
+    "ConversationCompactor": ".compactor",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "DataAgent",
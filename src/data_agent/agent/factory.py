@@ -9,7 +9,7 @@
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..config.loader import get_agent_config
 from ..config.schema import AgentSystemConfig, SubAgentConfig
@@ -58,6 +58,8 @@ class SubAgentFactory:
 
     def __init__(self):
         self._registry = get_tool_registry()
+        # 自动生成的协调者提示词缓存: (生成时的配置对象, 提示词)
+        self._coordinator_prompt: Optional[Tuple[AgentSystemConfig, str]] = None
 
     def create_subagent_config(
         self,
@@ -161,8 +163,11 @@ class SubAgentFactory:
         if coord.use_default_prompt:
             return None
 
-        # 自动生成协调者提示词
-        return self._generate_coordinator_prompt(config)
+        # 自动生成协调者提示词（配置对象未变化时复用上次结果）
+        cached = self._coordinator_prompt
+        if cached is None or cached[0] is not config:
+            cached = self._coordinator_prompt = (config, self._generate_coordinator_prompt(config))
+        return cached[1]
 
     def _generate_coordinator_prompt(self, config: AgentSystemConfig) -> str:
         """根据子代理配置自动生成协调者提示词"""
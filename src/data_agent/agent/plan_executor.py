@@ -12,13 +12,15 @@ from typing import List, Optional, Callable, Any
 
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
 from rich.prompt import Confirm
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..config.modes import get_mode_manager, PlanModeValue
 
+# 计划响应中的 ```json 代码块，以及无代码块时的裸 JSON 对象
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r'\{[\s\S]*\}')
+
 
 class TaskComplexity(Enum):
     """任务复杂度"""
@@ -36,7 +38,24 @@ class StepStatus(Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+# 步骤状态图标及显示样式
+_STATUS_ICONS = {
+    StepStatus.PENDING: "○",
+    StepStatus.RUNNING: "→",
+    StepStatus.COMPLETED: "✓",
+    StepStatus.FAILED: "✗",
+    StepStatus.SKIPPED: "⊘",
+}
+_STATUS_STYLES = {
+    StepStatus.PENDING: ("○", "dim"),
+    StepStatus.RUNNING: ("→", "yellow"),
+    StepStatus.COMPLETED: ("✓", "green"),
+    StepStatus.FAILED: ("✗", "red"),
+    StepStatus.SKIPPED: ("⊘", "dim"),
+}
+
+
+@dataclass(slots=True)
 class PlanStep:
     """计划步骤"""
     index: int
@@ -46,7 +65,7 @@ class PlanStep:
     result: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionPlan:
     """执行计划"""
     goal: str
@@ -64,16 +83,9 @@ class ExecutionPlan:
             ""
         ]
 
-        status_icons = {
-            StepStatus.PENDING: "○",
-            StepStatus.RUNNING: "→",
-            StepStatus.COMPLETED: "✓",
-            StepStatus.FAILED: "✗",
-            StepStatus.SKIPPED: "⊘",
-        }
-
+        icons = _STATUS_ICONS
         for step in self.steps:
-            icon = status_icons.get(step.status, "○")
+            icon = icons.get(step.status, "○")
             lines.append(f"{icon} **步骤 {step.index}**: {step.description}")
             if step.tool_hint:
                 lines.append(f"   _工具: {step.tool_hint}_")
@@ -192,13 +204,13 @@ class PlanExecutor:
 
     def parse_plan_response(self, response: str, original_goal: str) -> Optional[ExecutionPlan]:
         """解析 LLM 返回的计划"""
-        # 提取 JSON 块
-        json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
+        # 提取 JSON 块（没有代码围栏时跳过正则匹配）
+        json_match = _JSON_BLOCK_RE.search(response) if "```" in response else None
         if json_match:
             json_str = json_match.group(1)
         else:
             # 尝试直接查找 JSON 对象
-            json_match = re.search(r'\{[\s\S]*\}', response)
+            json_match = _JSON_OBJECT_RE.search(response)
             if not json_match:
                 return None
             json_str = json_match.group()
@@ -228,6 +240,8 @@ class PlanExecutor:
 
     def display_plan(self, plan: ExecutionPlan) -> None:
         """显示执行计划"""
+        from rich.markdown import Markdown
+
         self.console.print()
         self.console.print(Panel(
             Markdown(plan.to_markdown()),
@@ -271,16 +285,9 @@ class PlanExecutor:
         table.add_column("状态", width=3)
         table.add_column("步骤", style="white")
 
-        status_styles = {
-            StepStatus.PENDING: ("○", "dim"),
-            StepStatus.RUNNING: ("→", "yellow"),
-            StepStatus.COMPLETED: ("✓", "green"),
-            StepStatus.FAILED: ("✗", "red"),
-            StepStatus.SKIPPED: ("⊘", "dim"),
-        }
-
+        styles = _STATUS_STYLES
         for step in plan.steps:
-            icon, style = status_styles.get(step.status, ("○", "dim"))
+            icon, style = styles.get(step.status, ("○", "dim"))
             table.add_row(
                 f"[{style}]{icon}[/{style}]",
                 f"[{style}]步骤 {step.index}: {step.description}[/{style}]"
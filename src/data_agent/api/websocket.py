@@ -10,13 +10,14 @@ WebSocket 聊天端点
 import asyncio
 import json
 import logging
-import queue
 import threading
-from typing import Any, Dict, Optional
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
 from concurrent.futures import ThreadPoolExecutor
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from langchain_core.messages import AIMessage, ToolMessage
 
@@ -27,18 +28,15 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# DataAgent 实例（每个会话一个）
-_agents: Dict[str, DataAgent] = {}
-
-# 用户反馈队列（每个会话一个）
-_feedback_queues: Dict[str, asyncio.Queue] = {}
-
-# 待确认的工具调用（每个会话一个）
-_pending_confirmations: Dict[str, Dict[str, Any]] = {}
-
 # 线程池用于执行同步的 DataAgent 方法
 _executor = ThreadPoolExecutor(max_workers=4)
 
+# 单个 batch 帧最多合并的事件数
+_MAX_BATCH_EVENTS = 16
+
+# 需要安全确认的 SQL 工具名
+_SQL_TOOLS = frozenset({"execute_sql", "query_database", "run_sql"})
+
 
 # ============ 消息类型定义 ============
 
@@ -47,21 +45,51 @@ class ClientMessage(BaseModel):
     type: str  # "user_message" | "feedback" | "decision" | "cancel"
     content: Optional[str] = None
     decision: Optional[str] = None  # "approve" | "edit" | "reject"
-    tool_call_id: Optional[str] = None
+    tool_call_id: Optional[int] = None
     edited_args: Optional[Dict[str, Any]] = None
 
 
-class ServerMessage(BaseModel):
-    """服务端发送的消息"""
-    type: str
-    # 根据 type 不同，包含不同字段
+# ============ 会话状态 ============
+
+@dataclass(slots=True)
+class Session:
+    """
+    WebSocket 会话状态
+
+    同一会话的全部状态集中在一个对象中，每条消息只需一次字典查找。
+    DataAgent 跨连接保留；反馈和待确认请求在连接断开时清空。
+    """
+    session_id: str
+    agent: Optional[DataAgent] = None
+    # 用户反馈（事件循环写入、聊天线程读取，deque 的 append/popleft 线程安全）
+    feedback: Deque[str] = field(default_factory=deque)
+    # 待确认的工具调用，按 tool_call_id 索引
+    pending: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    # 取消标志
+    cancel: threading.Event = field(default_factory=threading.Event)
+    # 当前是否正在处理消息
+    processing: bool = False
+    # 当前处理中的事件队列（取消时用于唤醒发送循环）
+    events: Optional[asyncio.Queue] = None
+
+
+# 会话状态（每个 session_id 一个）
+_sessions: Dict[str, Session] = {}
 
 
 # ============ 辅助函数 ============
 
-def get_or_create_agent(session_id: str) -> DataAgent:
-    """获取或创建 DataAgent 实例"""
-    if session_id not in _agents:
+def get_session(session_id: str) -> Session:
+    """获取或创建会话状态"""
+    sess = _sessions.get(session_id)
+    if sess is None:
+        sess = _sessions[session_id] = Session(session_id)
+    return sess
+
+
+def get_or_create_agent(sess: Session) -> DataAgent:
+    """获取或创建会话的 DataAgent 实例"""
+    if sess.agent is None:
         # 创建 agent 前，设置 API 友好的模式
         mode_manager = get_mode_manager()
         # 关闭 plan_mode 避免用户确认提示
@@ -70,8 +98,8 @@ def get_or_create_agent(session_id: str) -> DataAgent:
         mode_manager.set("auto", "on")
 
         # 传递 session_id 确保导出文件保存到正确的会话目录
-        _agents[session_id] = DataAgent(session_id=session_id)
-    return _agents[session_id]
+        sess.agent = DataAgent(session_id=sess.session_id)
+    return sess.agent
 
 
 async def send_json(websocket: WebSocket, data: Dict[str, Any]):
@@ -81,21 +109,21 @@ async def send_json(websocket: WebSocket, data: Dict[str, Any]):
 
 def is_sql_tool(tool_name: str) -> bool:
     """判断是否为 SQL 工具"""
-    sql_tools = {"execute_sql", "query_database", "run_sql"}
-    return tool_name.lower() in sql_tools or "sql" in tool_name.lower()
+    name = tool_name.lower()
+    return name in _SQL_TOOLS or "sql" in name
 
 
-def needs_confirmation(tool_name: str, tool_args: Dict[str, Any]) -> bool:
+def needs_confirmation(tool_name: str, tool_args: Dict[str, Any], safe_mode: bool) -> bool:
     """
     判断工具调用是否需要用户确认
 
     仅在安全模式开启时，SQL 操作需要确认。
     Python 执行不需要确认（沙盒保护）。
-    """
-    mode_manager = get_mode_manager()
 
+    safe_mode 由调用方在每轮对话开始时快照传入，避免每次工具调用都重新查询模式管理器。
+    """
     # 安全模式关闭时，不需要确认
-    if not mode_manager.config.safe_mode:
+    if not safe_mode:
         return False
 
     # 只有 SQL 工具需要确认
@@ -122,30 +150,24 @@ async def websocket_chat(websocket: WebSocket, session_id: str = "default"):
     客户端 → 服务端:
     - { type: "user_message", content: "..." }  新消息
     - { type: "feedback", content: "..." }      AI 工作期间的反馈
-    - { type: "decision", decision: "approve"|"edit"|"reject", tool_call_id: "...", edited_args?: {...} }
+    - { type: "decision", decision: "approve"|"edit"|"reject", tool_call_id: N, edited_args?: {...} }
     - { type: "cancel" }                         取消执行
 
     服务端 → 客户端:
-    - { type: "tool_call", tool_name: "...", args: {...}, tool_call_id: "...", step: N }
-    - { type: "tool_result", tool_name: "...", result: "...", tool_call_id: "...", step: N }
-    - { type: "confirmation_request", tool_name: "...", args: {...}, tool_call_id: "...", description: "..." }
+    - { type: "tool_call", tool_name: "...", args: {...}, tool_call_id: N, step: N }
+    - { type: "tool_result", tool_name: "...", result: "...", tool_call_id: N, step: N }
+    - { type: "confirmation_request", tool_name: "...", args: {...}, tool_call_id: N, description: "..." }
     - { type: "thinking", content: "..." }
     - { type: "message", content: "..." }
     - { type: "feedback_ack", message: "..." }
     - { type: "error", error: "..." }
     - { type: "done" }
+    - { type: "batch", events: [...] }          多个已就绪事件合并为一帧发送
     """
     await websocket.accept()
-    logger.info(f"WebSocket 连接已建立: session_id={session_id}")
+    logger.info("WebSocket 连接已建立: session_id=%s", session_id)
 
-    # 初始化会话的反馈队列
-    if session_id not in _feedback_queues:
-        _feedback_queues[session_id] = asyncio.Queue()
-
-    # 当前是否正在处理消息
-    is_processing = False
-    # 取消标志
-    cancel_flag = threading.Event()
+    sess = get_session(session_id)
 
     try:
         while True:
@@ -153,54 +175,50 @@ async def websocket_chat(websocket: WebSocket, session_id: str = "default"):
             raw_message = await websocket.receive_text()
 
             try:
-                client_msg = json.loads(raw_message)
-                msg_type = client_msg.get("type", "")
+                # pydantic-core 一次完成 JSON 解析与校验
+                client_msg = ClientMessage.model_validate_json(raw_message)
+                msg_type = client_msg.type
 
                 if msg_type == "user_message":
                     # 新消息 - 开始处理
-                    if is_processing:
+                    if sess.processing:
                         await send_json(websocket, {
                             "type": "error",
                             "error": "正在处理上一条消息，请稍候"
                         })
                         continue
 
-                    is_processing = True
-                    cancel_flag.clear()
-                    user_content = client_msg.get("content", "")
+                    sess.processing = True
+                    sess.cancel.clear()
+                    user_content = client_msg.content or ""
 
                     # 在后台任务中处理消息
-                    asyncio.create_task(
-                        process_user_message(
-                            websocket, session_id, user_content,
-                            cancel_flag, lambda: setattr_wrapper(locals(), 'is_processing', False)
-                        )
-                    )
-                    # 注意：is_processing 会在 process_user_message 完成后被设置为 False
+                    # 注意：sess.processing 会在 process_user_message 完成后被设置为 False
+                    asyncio.create_task(process_user_message(websocket, sess, user_content))
 
                 elif msg_type == "feedback":
                     # 用户反馈 - 添加到反馈队列
-                    feedback_content = client_msg.get("content", "")
+                    feedback_content = client_msg.content or ""
                     if feedback_content:
-                        await _feedback_queues[session_id].put(feedback_content)
+                        sess.feedback.append(feedback_content)
                         await send_json(websocket, {
                             "type": "feedback_ack",
                             "message": f"已收到您的反馈: {feedback_content[:50]}..."
                         })
-                        logger.info(f"收到用户反馈: {feedback_content[:100]}")
+                        logger.info("收到用户反馈: %.100s", feedback_content)
 
                 elif msg_type == "decision":
                     # 用户决定 - 处理确认请求
-                    decision = client_msg.get("decision", "")
-                    tool_call_id = client_msg.get("tool_call_id", "")
-                    edited_args = client_msg.get("edited_args")
+                    decision = client_msg.decision or ""
+                    tool_call_id = client_msg.tool_call_id
+                    edited_args = client_msg.edited_args
 
-                    if session_id in _pending_confirmations and tool_call_id in _pending_confirmations[session_id]:
-                        pending = _pending_confirmations[session_id][tool_call_id]
+                    pending = sess.pending.get(tool_call_id)
+                    if pending is not None:
                         pending["decision"] = decision
                         pending["edited_args"] = edited_args
                         pending["event"].set()  # 唤醒等待的线程
-                        logger.info(f"用户决定: {decision} for {tool_call_id}")
+                        logger.info("用户决定: %s for %s", decision, tool_call_id)
                     else:
                         await send_json(websocket, {
                             "type": "error",
@@ -209,13 +227,17 @@ async def websocket_chat(websocket: WebSocket, session_id: str = "default"):
 
                 elif msg_type == "cancel":
                     # 取消执行
-                    cancel_flag.set()
+                    sess.cancel.set()
+                    if sess.events is not None:
+                        # 唤醒发送循环，并将会话从被取消的一轮中解除
+                        sess.events.put_nowait(None)
+                        sess.events = None
                     await send_json(websocket, {
                         "type": "message",
                         "content": "执行已取消"
                     })
                     await send_json(websocket, {"type": "done"})
-                    is_processing = False
+                    sess.processing = False
                     logger.info("用户取消执行")
 
                 else:
@@ -224,16 +246,16 @@ async def websocket_chat(websocket: WebSocket, session_id: str = "default"):
                         "error": f"未知的消息类型: {msg_type}"
                     })
 
-            except json.JSONDecodeError:
+            except ValidationError:
                 await send_json(websocket, {
                     "type": "error",
-                    "error": "无效的 JSON 格式"
+                    "error": "无效的消息格式"
                 })
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket 连接已断开: session_id={session_id}")
+        logger.info("WebSocket 连接已断开: session_id=%s", session_id)
     except Exception as e:
-        logger.error(f"WebSocket 错误: {e}")
+        logger.error("WebSocket 错误: %s", e)
         try:
             await send_json(websocket, {
                 "type": "error",
@@ -242,47 +264,44 @@ async def websocket_chat(websocket: WebSocket, session_id: str = "default"):
         except:
             pass
     finally:
-        # 清理资源
-        if session_id in _feedback_queues:
-            del _feedback_queues[session_id]
-        if session_id in _pending_confirmations:
-            del _pending_confirmations[session_id]
-
-
-def setattr_wrapper(d: dict, key: str, value: Any):
-    """辅助函数，用于在 lambda 中设置变量"""
-    d[key] = value
+        # 清理资源（DataAgent 保留，以便重连后继续对话）
+        sess.feedback.clear()
+        sess.pending.clear()
 
 
 async def process_user_message(
     websocket: WebSocket,
-    session_id: str,
+    sess: Session,
     user_message: str,
-    cancel_flag: threading.Event,
-    on_complete: callable
 ):
     """
     处理用户消息
 
     在后台运行 DataAgent，同时监听用户反馈和确认请求。
     """
+    # 事件队列：聊天线程通过 call_soon_threadsafe 投递，有事件时立即唤醒事件循环
+    event_queue: asyncio.Queue = asyncio.Queue()
+    sess.events = event_queue
+
     try:
-        agent = get_or_create_agent(session_id)
+        agent = get_or_create_agent(sess)
+        cancel_flag = sess.cancel
+        loop = asyncio.get_running_loop()
 
-        # 事件队列用于线程间通信
-        event_queue: queue.Queue = queue.Queue()
+        def emit(event: Dict[str, Any]) -> None:
+            """从聊天线程投递事件"""
+            loop.call_soon_threadsafe(event_queue.put_nowait, event)
         step_counter = [0]
         subagent_step_counter = [0]
 
-        # 初始化确认存储
-        if session_id not in _pending_confirmations:
-            _pending_confirmations[session_id] = {}
+        # 本轮对话内快照安全模式，工具调用回调中不再重复查询
+        safe_mode = get_mode_manager().config.safe_mode
 
         def on_thinking(content: str):
             """思考内容回调"""
             if cancel_flag.is_set():
                 return
-            event_queue.put({
+            emit({
                 "type": "thinking",
                 "content": content
             })
@@ -293,13 +312,14 @@ async def process_user_message(
                 return
 
             step_counter[0] += 1
-            tool_call_id = f"tc_{session_id}_{step_counter[0]}"
+            # 会话内自增的整数即可唯一标识工具调用，直接作为字典键和协议字段
+            tool_call_id = step_counter[0]
 
             # 检查是否需要确认
-            if needs_confirmation(tool_name, tool_args):
+            if needs_confirmation(tool_name, tool_args, safe_mode):
                 # 需要确认 - 发送确认请求并等待
                 confirmation_event = threading.Event()
-                _pending_confirmations[session_id][tool_call_id] = {
+                sess.pending[tool_call_id] = {
                     "tool_name": tool_name,
                     "args": tool_args,
                     "event": confirmation_event,
@@ -307,7 +327,7 @@ async def process_user_message(
                     "edited_args": None
                 }
 
-                event_queue.put({
+                emit({
                     "type": "confirmation_request",
                     "tool_name": tool_name,
                     "args": tool_args,
@@ -317,7 +337,7 @@ async def process_user_message(
 
                 # 等待用户决定（最多等待 5 分钟）
                 if confirmation_event.wait(timeout=300):
-                    pending = _pending_confirmations[session_id].get(tool_call_id, {})
+                    pending = sess.pending.get(tool_call_id, {})
                     decision = pending.get("decision", "reject")
 
                     if decision == "reject":
@@ -331,11 +351,10 @@ async def process_user_message(
                     raise InterruptedError(f"确认超时，取消执行 {tool_name}")
 
                 # 清理
-                if tool_call_id in _pending_confirmations.get(session_id, {}):
-                    del _pending_confirmations[session_id][tool_call_id]
+                sess.pending.pop(tool_call_id, None)
 
             # 发送工具调用事件
-            event_queue.put({
+            emit({
                 "type": "tool_call",
                 "tool_name": tool_name,
                 "args": tool_args,
@@ -347,7 +366,7 @@ async def process_user_message(
             """工具结果回调"""
             if cancel_flag.is_set():
                 return
-            event_queue.put({
+            emit({
                 "type": "tool_result",
                 "tool_name": tool_name,
                 "result": result,
@@ -359,7 +378,7 @@ async def process_user_message(
             if cancel_flag.is_set():
                 return
             subagent_step_counter[0] += 1
-            event_queue.put({
+            emit({
                 "type": "subagent_tool_call",
                 "subagent_name": data.get("subagent_name", "unknown"),
                 "tool_name": data.get("tool_name", "unknown"),
@@ -371,7 +390,7 @@ async def process_user_message(
             """子代理工具结果回调"""
             if cancel_flag.is_set():
                 return
-            event_queue.put({
+            emit({
                 "type": "subagent_tool_result",
                 "subagent_name": data.get("subagent_name", "unknown"),
                 "tool_name": data.get("tool_name", "unknown"),
@@ -395,9 +414,8 @@ async def process_user_message(
                 feedback_messages = []
                 try:
                     while True:
-                        feedback = _feedback_queues[session_id].get_nowait()
-                        feedback_messages.append(feedback)
-                except (asyncio.QueueEmpty, KeyError):
+                        feedback_messages.append(sess.feedback.popleft())
+                except IndexError:
                     pass
 
                 # 如果有反馈，添加到用户消息中
@@ -413,25 +431,25 @@ async def process_user_message(
                     on_tool_result=on_tool_result
                 )
 
-                event_queue.put({
+                emit({
                     "type": "message",
                     "content": response
                 })
 
             except InterruptedError as e:
-                event_queue.put({
+                emit({
                     "type": "message",
                     "content": str(e)
                 })
             except Exception as e:
-                logger.error(f"聊天处理错误: {e}")
-                event_queue.put({
+                logger.error("聊天处理错误: %s", e)
+                emit({
                     "type": "error",
                     "error": str(e)
                 })
             finally:
                 agent.clear_subagent_callbacks()
-                event_queue.put({"type": "done"})
+                emit({"type": "done"})
 
         # 启动聊天线程
         chat_thread = threading.Thread(target=run_chat, daemon=True)
@@ -439,35 +457,52 @@ async def process_user_message(
 
         # 从事件队列读取并发送到 WebSocket
         while True:
-            try:
-                # 非阻塞检查事件队列
-                event = event_queue.get(timeout=0.1)
-                await send_json(websocket, event)
+            event = await event_queue.get()
+            # None 是取消时投递的唤醒信号
+            if event is None or cancel_flag.is_set():
+                break
 
-                if event.get("type") == "done":
+            # 合并队列中已就绪的事件，减少 WebSocket 帧数
+            events = [event]
+            cancelled = False
+            while len(events) < _MAX_BATCH_EVENTS and event.get("type") != "done":
+                try:
+                    event = event_queue.get_nowait()
+                except asyncio.QueueEmpty:
                     break
-
-            except queue.Empty:
-                # 检查是否取消
-                if cancel_flag.is_set():
+                if event is None:
+                    # 已合并的事件照常发送，之后结束循环
+                    cancelled = True
                     break
-                continue
+                events.append(event)
+
+            try:
+                if len(events) == 1:
+                    await send_json(websocket, events[0])
+                else:
+                    await send_json(websocket, {"type": "batch", "events": events})
             except Exception as e:
-                logger.error(f"发送事件错误: {e}")
+                logger.error("发送事件错误: %s", e)
+                break
+
+            if cancelled or events[-1].get("type") == "done" or cancel_flag.is_set():
                 break
 
         # 等待线程结束
         chat_thread.join(timeout=1.0)
 
     except Exception as e:
-        logger.error(f"处理消息错误: {e}")
+        logger.error("处理消息错误: %s", e)
         await send_json(websocket, {
             "type": "error",
             "error": str(e)
         })
         await send_json(websocket, {"type": "done"})
     finally:
-        on_complete()
+        # 本轮被取消后客户端可能已开始新一轮，此时会话状态属于新一轮，不能清除
+        if sess.events is event_queue:
+            sess.events = None
+            sess.processing = False
 
 
 # ============ HTTP 端点（兼容） ============
@@ -477,9 +512,12 @@ async def websocket_status():
     """WebSocket 服务状态"""
     return {
         "status": "ok",
-        "active_sessions": list(_agents.keys()),
+        "active_sessions": [
+            sid for sid, sess in _sessions.items() if sess.agent is not None
+        ],
         "pending_confirmations": {
-            sid: list(pending.keys())
-            for sid, pending in _pending_confirmations.items()
+            sid: list(sess.pending.keys())
+            for sid, sess in _sessions.items()
+            if sess.pending
         }
     }
@@ -7,11 +7,15 @@
 - exit 退出程序
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Dict, Optional
 
+from prompt_toolkit import PromptSession
+from prompt_toolkit.formatted_text import HTML
+from pygments.lexer import Lexer
+from pygments.lexers import get_lexer_by_name
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
 from rich.syntax import Syntax
 from rich.table import Table
 
@@ -20,6 +24,15 @@ from ..config.settings import get_settings
 from ..commands import get_registry, register_all_commands
 from ..ui import StepPager, format_tool_result, format_tool_args_display
 
+# 输入提示符（预先构建，避免每次输入时重新解析 Rich 标记）
+_PROMPT = HTML("<b><ansigreen>您: </ansigreen></b>")
+
+
+@lru_cache(maxsize=8)
+def _get_lexer(lang: str) -> Lexer:
+    """获取语法高亮 lexer（按语言缓存，避免每次查看步骤都重新初始化）"""
+    return get_lexer_by_name(lang)
+
 
 def _print_config(console: Console) -> None:
     """打印配置信息"""
@@ -63,6 +76,24 @@ class SyncCLI:
         register_all_commands()
         self.registry = get_registry()
 
+        # 输入会话（保留输入历史，支持行编辑）
+        self._prompt_session: PromptSession = PromptSession()
+
+        # 内置命令分发表（小写命令 -> 处理函数）
+        self._handlers: Dict[str, Callable[[], None]] = {
+            "exit": self._on_exit,
+            "quit": self._on_exit,
+            "q": self._on_exit,
+            "退出": self._on_exit,
+            "/clear": self._on_clear,
+            "/config": self._on_config,
+            "/steps": self._list_steps,
+            # 旧式命令（向后兼容）
+            "help": self._on_help,
+            "config": self._on_config,
+            "clear": self._on_clear,
+        }
+
         # 执行状态
         self.is_running = False
         self.should_cancel = False
@@ -75,7 +106,7 @@ class SyncCLI:
         while True:
             try:
                 # 获取用户输入
-                user_input = self.console.input("[bold green]您: [/bold green]").strip()
+                user_input = self._prompt_session.prompt(_PROMPT).strip()
 
                 if not user_input:
                     continue
@@ -109,12 +140,14 @@ class SyncCLI:
 
     def _handle_command(self, user_input: str) -> bool:
         """处理命令，返回 True 表示已处理"""
-        cmd = user_input.lower()
-
-        # 退出命令
-        if cmd in ("exit", "quit", "q", "退出"):
-            self.console.print("[yellow]再见！[/yellow]")
-            raise EOFError()
+        # 内置命令（退出、清除、配置等）；先按原样查找，未命中再做大小写折叠
+        handlers = self._handlers
+        handler = handlers.get(user_input)
+        if handler is None:
+            handler = handlers.get(user_input.casefold())
+        if handler is not None:
+            handler()
+            return True
 
         # 步骤查看命令 :数字
         if user_input.startswith(":"):
@@ -125,37 +158,33 @@ class SyncCLI:
                 self.console.print("[yellow]用法: :步骤号（如 :12）[/yellow]")
             return True
 
-        # 斜杠命令
+        # 其他斜杠命令交给命令注册表
         if user_input.startswith("/"):
-            if cmd == "/clear":
-                self.agent.clear_history()
-                self.step_pager.clear_history()
-                self.step_count = 0
-                self.console.print("[green]对话历史已清除。[/green]")
-            elif cmd == "/config":
-                _print_config(self.console)
-            elif cmd == "/steps":
-                self._list_steps()
-            else:
-                self.registry.execute(user_input, self.console)
-            return True
-
-        # 旧式命令（向后兼容）
-        if cmd == "help":
-            self.registry.show_help(self.console)
-            return True
-        elif cmd == "config":
-            _print_config(self.console)
-            return True
-        elif cmd == "clear":
-            self.agent.clear_history()
-            self.step_pager.clear_history()
-            self.step_count = 0
-            self.console.print("[green]对话历史已清除。[/green]")
+            self.registry.execute(user_input, self.console)
             return True
 
         return False
 
+    def _on_exit(self):
+        """退出程序"""
+        self.console.print("[yellow]再见！[/yellow]")
+        raise EOFError()
+
+    def _on_clear(self):
+        """清除对话历史"""
+        self.agent.clear_history()
+        self.step_pager.clear_history()
+        self.step_count = 0
+        self.console.print("[green]对话历史已清除。[/green]")
+
+    def _on_config(self):
+        """显示配置信息"""
+        _print_config(self.console)
+
+    def _on_help(self):
+        """显示命令帮助"""
+        self.registry.show_help(self.console)
+
     def _show_step_detail(self, step_num: int):
         """显示步骤详情"""
         step = self.step_pager.get_step(step_num)
@@ -163,32 +192,36 @@ class SyncCLI:
             self.console.print(f"[red]步骤 {step_num} 不存在[/red]")
             return
 
-        self.console.print()
-        self.console.print(f"[bold cyan]{'─' * 20} Step {step.step_num}: {step.tool_name} {'─' * 20}[/bold cyan]")
+        # 结果可能有上百行，逐行打印前先绑定到局部变量，省去每次的属性查找
+        cprint = self.console.print
+
+        cprint()
+        cprint(f"[bold cyan]{'─' * 20} Step {step.step_num}: {step.tool_name} {'─' * 20}[/bold cyan]")
 
         # 显示代码/参数
         if step.tool_name == "execute_python_safe" and "code" in step.tool_args:
-            self.console.print("[bold yellow]代码:[/bold yellow]")
-            syntax = Syntax(step.tool_args["code"], "python", theme="monokai", line_numbers=True)
-            self.console.print(syntax)
+            cprint("[bold yellow]代码:[/bold yellow]")
+            syntax = Syntax(step.tool_args["code"], _get_lexer("python"), theme="monokai", line_numbers=True)
+            cprint(syntax)
         elif step.tool_name == "execute_sql" and "query" in step.tool_args:
-            self.console.print("[bold yellow]SQL:[/bold yellow]")
-            syntax = Syntax(step.tool_args["query"], "sql", theme="monokai", line_numbers=True)
-            self.console.print(syntax)
+            cprint("[bold yellow]SQL:[/bold yellow]")
+            syntax = Syntax(step.tool_args["query"], _get_lexer("sql"), theme="monokai", line_numbers=True)
+            cprint(syntax)
         else:
-            self.console.print("[bold yellow]参数:[/bold yellow]")
+            cprint("[bold yellow]参数:[/bold yellow]")
             for key, value in step.tool_args.items():
-                val_str = str(value)[:200] + "..." if len(str(value)) > 200 else str(value)
-                self.console.print(f"  {key}: {val_str}")
+                text = str(value)
+                val_str = text[:200] + "..." if len(text) > 200 else text
+                cprint(f"  {key}: {val_str}")
 
         if step.result:
-            self.console.print()
-            self.console.print("[bold yellow]执行结果:[/bold yellow]")
+            cprint()
+            cprint("[bold yellow]执行结果:[/bold yellow]")
             for line in step.result.split("\n"):
-                self.console.print(f"  {line}")
+                cprint(f"  {line}")
 
-        self.console.print(f"[bold cyan]{'─' * 60}[/bold cyan]")
-        self.console.print()
+        cprint(f"[bold cyan]{'─' * 60}[/bold cyan]")
+        cprint()
 
     def _list_steps(self):
         """列出所有步骤"""
@@ -260,6 +293,8 @@ class SyncCLI:
             )
 
             if response:
+                from rich.markdown import Markdown
+
                 self.console.print(Panel(
                     Markdown(response),
                     title="Agent 回复",
@@ -4,222 +4,197 @@
 实现各种模式的切换命令。
 """
 
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
 
 from rich.console import Console
-from rich.prompt import Confirm
 
 from .base import Command
 from .registry import get_registry
 from ..config.modes import get_mode_manager, MODE_DEFINITIONS
 
+if TYPE_CHECKING:
+    from rich.prompt import Confirm
 
-class PlanCommand(Command):
-    """Plan Mode 切换命令"""
+# 开关状态显示
+_STATUS_ON = "[green]ON[/green]"
+_STATUS_OFF = "[red]OFF[/red]"
 
-    name = "plan"
-    description = "切换计划模式"
-    usage = "on|off|auto"
+# 按提示文本缓存的 Confirm 实例
+_confirm_prompts: Dict[str, "Confirm"] = {}
 
-    def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
 
-        if not args:
-            current = manager.get("plan")
-            console.print(f"当前计划模式: [yellow]{current.value}[/yellow]")
-            console.print()
-            console.print("  [cyan]off[/cyan]  - 直接执行任务")
-            console.print("  [cyan]on[/cyan]   - 先生成计划，确认后执行")
-            console.print("  [cyan]auto[/cyan] - 复杂任务自动进入规划")
-            return True
+def _confirm(question: str) -> bool:
+    """二次确认（默认否），Confirm 实例首次使用时创建并复用"""
+    prompt = _confirm_prompts.get(question)
+    if prompt is None:
+        from rich.prompt import Confirm
 
-        value = args[0].lower()
-        if value not in ["on", "off", "auto"]:
-            console.print(f"[red]无效值: {value}[/red]")
-            console.print("允许值: on, off, auto")
-            return True
+        prompt = _confirm_prompts[question] = Confirm(question)
+    return prompt(default=False)
 
-        if manager.set("plan", value):
-            console.print(f"[green]计划模式已设置为: {value}[/green]")
-        else:
-            console.print("[red]设置失败[/red]")
 
-        return True
+class ModeCommand(Command):
+    """模式命令基类（构造时绑定模式管理器，执行时不再重复获取）"""
 
+    # 允许的参数值（已小写）
+    VALID: frozenset = frozenset()
 
-class AutoCommand(Command):
-    """Auto Execute 切换命令"""
+    def __init__(self):
+        self._manager = get_mode_manager()
 
-    name = "auto"
-    description = "切换自动执行模式"
-    usage = "on|off"
+    def _normalize_value(self, arg: str) -> str:
+        """规范化参数值：已是合法值时直接使用，否则才转为小写"""
+        return arg if arg in self.VALID else arg.lower()
 
-    def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
 
-        if not args:
-            current = manager.get("auto")
-            status = "[green]ON[/green]" if current else "[red]OFF[/red]"
-            console.print(f"自动执行: {status}")
-            console.print()
-            console.print("  [cyan]on[/cyan]  - 自动执行工具调用")
-            console.print("  [cyan]off[/cyan] - 每次工具调用前需确认")
-            return True
+class BoolModeCommand(ModeCommand):
+    """
+    开关类模式命令（on|off）
 
-        value = args[0].lower()
-        if value not in ["on", "off"]:
-            console.print(f"[red]无效值: {value}[/red]")
-            console.print("允许值: on, off")
-            return True
+    由 register_all_commands 按模式参数构造，各模式只在提示文案上有差异。
+    """
 
-        if manager.set("auto", value == "on"):
-            status = "[green]ON[/green]" if value == "on" else "[red]OFF[/red]"
-            console.print(f"自动执行已设置为: {status}")
-        else:
-            console.print("[red]设置失败[/red]")
-
-        return True
-
-
-class SafeCommand(Command):
-    """Safe Mode 切换命令"""
-
-    name = "safe"
-    description = "切换安全模式"
     usage = "on|off"
 
+    VALID = frozenset({"on", "off"})
+    ALLOWED_MSG = "允许值: on, off"
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        description: str,
+        mode_key: Optional[str] = None,
+        aliases: Sequence[str] = (),
+        hints: Sequence[str] = (),
+        on_hint: Optional[str] = None,
+        off_hint: Optional[str] = None,
+        confirm_off: Optional[str] = None,
+    ):
+        """
+        Args:
+            name: 命令名称
+            label: 模式显示名（如 "自动执行"）
+            description: 命令描述
+            mode_key: 模式键名，默认与命令名相同
+            aliases: 命令别名
+            hints: 无参数时在状态后显示的说明行
+            on_hint: 模式开启时显示的说明
+            off_hint: 模式关闭时显示的说明
+            confirm_off: 关闭模式前的警告，设置后关闭需要二次确认
+        """
+        super().__init__()
+        self.name = name
+        self.label = label
+        self.description = description
+        self.mode_key = mode_key or name
+        self.aliases = list(aliases)
+        self.hints = tuple(hints)
+        self.on_hint = on_hint
+        self.off_hint = off_hint
+        self.confirm_off = confirm_off
+
     def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
+        manager = self._manager
 
         if not args:
-            current = manager.get("safe")
-            status = "[green]ON[/green]" if current else "[red]OFF[/red]"
-            console.print(f"安全模式: {status}")
-            if current:
-                console.print("  [dim]危险 SQL 操作（DROP/DELETE/UPDATE）将被阻止[/dim]")
-            else:
-                console.print("  [yellow]警告: 安全模式已关闭，请谨慎操作[/yellow]")
+            current = manager.get(self.mode_key)
+            status = _STATUS_ON if current else _STATUS_OFF
+            console.print(f"{self.label}: {status}")
+            hint = self.on_hint if current else self.off_hint
+            if hint:
+                console.print(hint)
+            for line in self.hints:
+                console.print(line)
             return True
 
-        value = args[0].lower()
-        if value not in ["on", "off"]:
+        value = self._normalize_value(args[0])
+        if value not in self.VALID:
             console.print(f"[red]无效值: {value}[/red]")
-            console.print("允许值: on, off")
+            console.print(self.ALLOWED_MSG)
             return True
 
-        if value == "off":
-            # 关闭安全模式需要二次确认
-            console.print("[yellow]警告: 关闭安全模式将允许执行危险 SQL 操作！[/yellow]")
-            if not Confirm.ask("确定关闭？", default=False):
+        if value == "off" and self.confirm_off:
+            # 关闭该模式需要二次确认
+            console.print(self.confirm_off)
+            if not _confirm("确定关闭？"):
                 console.print("已取消")
                 return True
 
-        if manager.set("safe", value == "on"):
-            status = "[green]ON[/green]" if value == "on" else "[red]OFF[/red]"
-            console.print(f"安全模式已设置为: {status}")
-        else:
-            console.print("[red]设置失败[/red]")
-
-        return True
-
-
-class VerboseCommand(Command):
-    """Verbose Mode 切换命令"""
-
-    name = "verbose"
-    aliases = ["v"]
-    description = "切换详细输出模式"
-    usage = "on|off"
-
-    def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
-
-        if not args:
-            current = manager.get("verbose")
-            status = "[green]ON[/green]" if current else "[red]OFF[/red]"
-            console.print(f"详细输出: {status}")
-            return True
-
-        value = args[0].lower()
-        if value not in ["on", "off"]:
-            console.print(f"[red]无效值: {value}[/red]")
-            console.print("允许值: on, off")
-            return True
-
-        if manager.set("verbose", value == "on"):
-            status = "[green]ON[/green]" if value == "on" else "[red]OFF[/red]"
-            console.print(f"详细输出已设置为: {status}")
+        if manager.set(self.mode_key, value == "on"):
+            status = _STATUS_ON if value == "on" else _STATUS_OFF
+            console.print(f"{self.label}已设置为: {status}")
         else:
             console.print("[red]设置失败[/red]")
 
         return True
 
 
-class PreviewCommand(Command):
-    """Preview Limit 设置命令"""
-
-    name = "preview"
-    description = "设置数据预览行数"
-    usage = "10|50|100|all"
+class EnumModeCommand(ModeCommand):
+    """
+    枚举类模式命令（如 plan、preview）
+
+    由 register_all_commands 按模式参数构造。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        description: str,
+        allowed: Sequence[str],
+        current_label: str,
+        mode_key: Optional[str] = None,
+        hints: Sequence[str] = (),
+    ):
+        """
+        Args:
+            name: 命令名称
+            label: 模式显示名（如 "计划模式"）
+            description: 命令描述
+            allowed: 允许的取值（按显示顺序）
+            current_label: 无参数时显示当前值的前缀（如 "当前计划模式"）
+            mode_key: 模式键名，默认与命令名相同
+            hints: 无参数时在当前值后显示的说明行
+        """
+        super().__init__()
+        self.name = name
+        self.label = label
+        self.description = description
+        self.mode_key = mode_key or name
+        self.usage = "|".join(allowed)
+        self.VALID = frozenset(allowed)
+        self.ALLOWED_MSG = f"允许值: {', '.join(allowed)}"
+        self.current_label = current_label
+        self.hints = tuple(hints)
 
     def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
+        manager = self._manager
 
         if not args:
-            current = manager.get("preview")
-            console.print(f"当前预览行数: [yellow]{current.value}[/yellow]")
-            console.print()
-            console.print("可选值: 10, 50, 100, all")
+            current = manager.get(self.mode_key)
+            console.print(f"{self.current_label}: [yellow]{current.value}[/yellow]")
+            if self.hints:
+                console.print()
+                for line in self.hints:
+                    console.print(line)
             return True
 
-        value = args[0].lower()
-        if value not in ["10", "50", "100", "all"]:
+        value = self._normalize_value(args[0])
+        if value not in self.VALID:
             console.print(f"[red]无效值: {value}[/red]")
-            console.print("允许值: 10, 50, 100, all")
+            console.print(self.ALLOWED_MSG)
             return True
 
-        if manager.set("preview", value):
-            console.print(f"[green]预览行数已设置为: {value}[/green]")
+        if manager.set(self.mode_key, value):
+            console.print(f"[green]{self.label}已设置为: {value}[/green]")
         else:
             console.print("[red]设置失败[/red]")
 
         return True
 
 
-class ExportCommand(Command):
-    """Export Mode 切换命令"""
-
-    name = "export"
-    description = "切换自动导出模式"
-    usage = "on|off"
-
-    def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
-
-        if not args:
-            current = manager.get("export")
-            status = "[green]ON[/green]" if current else "[red]OFF[/red]"
-            console.print(f"自动导出: {status}")
-            if current:
-                console.print("  [dim]查询结果将自动保存到文件[/dim]")
-            return True
-
-        value = args[0].lower()
-        if value not in ["on", "off"]:
-            console.print(f"[red]无效值: {value}[/red]")
-            console.print("允许值: on, off")
-            return True
-
-        if manager.set("export", value == "on"):
-            status = "[green]ON[/green]" if value == "on" else "[red]OFF[/red]"
-            console.print(f"自动导出已设置为: {status}")
-        else:
-            console.print("[red]设置失败[/red]")
-
-        return True
-
-
-class ModesCommand(Command):
+class ModesCommand(ModeCommand):
     """显示所有模式状态"""
 
     name = "modes"
@@ -227,7 +202,7 @@ class ModesCommand(Command):
     description = "显示当前所有模式状态"
 
     def execute(self, args: List[str], console: Console) -> bool:
-        manager = get_mode_manager()
+        manager = self._manager
         manager.display_modes(console)
         return True
 
@@ -239,8 +214,11 @@ class HelpCommand(Command):
     aliases = ["h", "?"]
     description = "显示帮助信息"
 
+    def __init__(self):
+        self._registry = get_registry()
+
     def execute(self, args: List[str], console: Console) -> bool:
-        get_registry().show_help(console)
+        self._registry.show_help(console)
         return True
 
 
@@ -256,15 +234,15 @@ class ClearCommand(Command):
         return False
 
 
-class ResetCommand(Command):
+class ResetCommand(ModeCommand):
     """重置所有模式"""
 
     name = "reset"
     description = "重置所有模式为默认值"
 
     def execute(self, args: List[str], console: Console) -> bool:
-        if Confirm.ask("确定重置所有模式为默认值？", default=False):
-            manager = get_mode_manager()
+        if _confirm("确定重置所有模式为默认值？"):
+            manager = self._manager
             manager.reset_to_defaults()
             console.print("[green]所有模式已重置为默认值[/green]")
             manager.display_modes(console)
@@ -273,19 +251,59 @@ class ResetCommand(Command):
         return True
 
 
+# 命令是否已注册（注册只需执行一次）
+_registered = False
+
+
 def register_all_commands() -> None:
-    """注册所有命令"""
+    """注册所有命令（幂等，重复调用直接返回）"""
+    global _registered
+    if _registered:
+        return
+
     from .reload_command import ReloadCommand, ConfigCommand as NewConfigCommand
 
     registry = get_registry()
 
     # 模式命令
-    registry.register(PlanCommand())
-    registry.register(AutoCommand())
-    registry.register(SafeCommand())
-    registry.register(VerboseCommand())
-    registry.register(PreviewCommand())
-    registry.register(ExportCommand())
+    registry.register(EnumModeCommand(
+        "plan", "计划模式", "切换计划模式",
+        allowed=("on", "off", "auto"),
+        current_label="当前计划模式",
+        hints=(
+            "  [cyan]off[/cyan]  - 直接执行任务",
+            "  [cyan]on[/cyan]   - 先生成计划，确认后执行",
+            "  [cyan]auto[/cyan] - 复杂任务自动进入规划",
+        ),
+    ))
+    registry.register(BoolModeCommand(
+        "auto", "自动执行", "切换自动执行模式",
+        hints=(
+            "",
+            "  [cyan]on[/cyan]  - 自动执行工具调用",
+            "  [cyan]off[/cyan] - 每次工具调用前需确认",
+        ),
+    ))
+    registry.register(BoolModeCommand(
+        "safe", "安全模式", "切换安全模式",
+        on_hint="  [dim]危险 SQL 操作（DROP/DELETE/UPDATE）将被阻止[/dim]",
+        off_hint="  [yellow]警告: 安全模式已关闭，请谨慎操作[/yellow]",
+        confirm_off="[yellow]警告: 关闭安全模式将允许执行危险 SQL 操作！[/yellow]",
+    ))
+    registry.register(BoolModeCommand(
+        "verbose", "详细输出", "切换详细输出模式",
+        aliases=("v",),
+    ))
+    registry.register(EnumModeCommand(
+        "preview", "预览行数", "设置数据预览行数",
+        allowed=("10", "50", "100", "all"),
+        current_label="当前预览行数",
+        hints=("可选值: 10, 50, 100, all",),
+    ))
+    registry.register(BoolModeCommand(
+        "export", "自动导出", "切换自动导出模式",
+        on_hint="  [dim]查询结果将自动保存到文件[/dim]",
+    ))
     registry.register(ModesCommand())
     registry.register(ResetCommand())
 
@@ -296,3 +314,5 @@ def register_all_commands() -> None:
     # 配置命令（使用新的实现）
     registry.register(NewConfigCommand())
     registry.register(ReloadCommand())
+
+    _registered = True
@@ -4,11 +4,10 @@
 管理所有命令的注册和执行。
 """
 
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
 
 from .base import Command
 
@@ -21,22 +20,26 @@ class CommandRegistry:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            # 主命令（不含别名），用于帮助和列表
             cls._instance._commands: Dict[str, Command] = {}
-            cls._instance._aliases: Dict[str, str] = {}
+            cls._instance._commands_view = MappingProxyType(cls._instance._commands)
+            # 命令名与别名合并后的解析表，get() 只需一次查找
+            cls._instance._resolve: Dict[str, Command] = {}
+            # 帮助表格行缓存（按命令名排序），注册新命令时失效
+            cls._instance._help_rows: Optional[List[Tuple[str, str]]] = None
         return cls._instance
 
     def register(self, command: Command) -> None:
         """注册命令"""
         self._commands[command.name] = command
+        self._resolve[command.name] = command
         for alias in command.aliases:
-            self._aliases[alias] = command.name
+            self._resolve[alias] = command
+        self._help_rows = None
 
     def get(self, name: str) -> Optional[Command]:
-        """获取命令"""
-        # 先检查别名
-        if name in self._aliases:
-            name = self._aliases[name]
-        return self._commands.get(name)
+        """获取命令（支持别名）"""
+        return self._resolve.get(name)
 
     def execute(self, input_str: str, console: Console) -> bool:
         """
@@ -52,14 +55,19 @@ class CommandRegistry:
         if not input_str.startswith("/"):
             return False
 
-        parts = input_str[1:].split()
-        if not parts:
+        body = input_str[1:].strip()
+        if not body:
             return False
 
-        cmd_name = parts[0].lower()
-        args = parts[1:]
+        # 只切出命令名（任意空白分隔），大多数命令不带参数，无需切分整个输入
+        cmd_name, *rest = body.split(None, 1)
+        args = rest[0].split() if rest else []
 
+        # 命令名通常已是小写，查找失败时才转换大小写
         command = self.get(cmd_name)
+        if command is None:
+            cmd_name = cmd_name.lower()
+            command = self.get(cmd_name)
         if command:
             return command.execute(args, console)
 
@@ -69,6 +77,9 @@ class CommandRegistry:
 
     def show_help(self, console: Console) -> None:
         """显示所有命令帮助"""
+        from rich.table import Table
+        from rich.panel import Panel
+
         table = Table(
             title="可用命令",
             show_header=True,
@@ -77,16 +88,20 @@ class CommandRegistry:
         table.add_column("命令", style="cyan", width=22)
         table.add_column("说明", style="white")
 
-        for name in sorted(self._commands.keys()):
-            cmd = self._commands[name]
-            usage = f"/{name} {cmd.usage}" if cmd.usage else f"/{name}"
-            table.add_row(usage, cmd.description)
+        if self._help_rows is None:
+            self._help_rows = [
+                (f"/{name} {cmd.usage}" if cmd.usage else f"/{name}", cmd.description)
+                for name, cmd in sorted(self._commands.items())
+            ]
+
+        for usage, description in self._help_rows:
+            table.add_row(usage, description)
 
         console.print(Panel(table, border_style="blue"))
 
-    def list_commands(self) -> Dict[str, Command]:
-        """获取所有命令"""
-        return self._commands.copy()
+    def list_commands(self) -> Mapping[str, Command]:
+        """获取所有命令（只读视图）"""
+        return self._commands_view
 
 
 def get_registry() -> CommandRegistry:
@@ -6,7 +6,7 @@
 
 from typing import List
 
-from rich.console import Console
+from rich.console import Console, Group
 
 from .base import Command
 
@@ -37,26 +37,29 @@ class ReloadCommand(Command):
             loader = get_config_loader()
             config_path = loader.config_path
 
-            console.print("[green]✓[/green] 配置已重新加载")
+            # 收集输出行，最后一次性打印
+            lines = ["[green]✓[/green] 配置已重新加载"]
 
             if config_path:
-                console.print(f"  配置文件: [cyan]{config_path}[/cyan]")
+                lines.append(f"  配置文件: [cyan]{config_path}[/cyan]")
 
             # 显示加载的子代理
             if config.subagents:
                 subagent_names = list(config.subagents.keys())
-                console.print(f"  子代理: [cyan]{', '.join(subagent_names)}[/cyan]")
+                lines.append(f"  子代理: [cyan]{', '.join(subagent_names)}[/cyan]")
             else:
-                console.print("  子代理: [dim]使用默认配置[/dim]")
+                lines.append("  子代理: [dim]使用默认配置[/dim]")
 
             # 显示 LLM profiles
             profile_names = list(config.llm.profiles.keys())
             if profile_names:
-                console.print(f"  LLM Profiles: [cyan]{', '.join(profile_names)}[/cyan]")
+                lines.append(f"  LLM Profiles: [cyan]{', '.join(profile_names)}[/cyan]")
 
-            console.print()
-            console.print("[dim]注意: 重载配置不会影响当前会话的 Agent 实例。[/dim]")
-            console.print("[dim]新配置将在下次创建 Agent 时生效。[/dim]")
+            lines.append("")
+            lines.append("[dim]注意: 重载配置不会影响当前会话的 Agent 实例。[/dim]")
+            lines.append("[dim]新配置将在下次创建 Agent 时生效。[/dim]")
+
+            console.print(Group(*lines))
 
             return True
 
@@ -94,7 +97,8 @@ class ConfigCommand(Command):
         basic_table.add_row("配置版本", config.version)
         basic_table.add_row("热重载", "启用" if config.hot_reload.enabled else "禁用")
 
-        console.print(Panel(basic_table, title="基础配置", border_style="blue"))
+        # 收集所有面板，最后一次性打印
+        renderables = [Panel(basic_table, title="基础配置", border_style="blue")]
 
         # LLM 配置表格
         llm_table = Table(show_header=True, header_style="bold")
@@ -118,7 +122,7 @@ class ConfigCommand(Command):
                 str(profile.temperature),
             )
 
-        console.print(Panel(llm_table, title="LLM Profiles", border_style="green"))
+        renderables.append(Panel(llm_table, title="LLM Profiles", border_style="green"))
 
         # 子代理配置表格
         if config.subagents:
@@ -136,9 +140,9 @@ class ConfigCommand(Command):
                     subagent.description[:40] + "..." if len(subagent.description) > 40 else subagent.description,
                 )
 
-            console.print(Panel(subagent_table, title="子代理配置", border_style="yellow"))
+            renderables.append(Panel(subagent_table, title="子代理配置", border_style="yellow"))
         else:
-            console.print("[dim]未配置子代理，使用默认配置[/dim]")
+            renderables.append("[dim]未配置子代理，使用默认配置[/dim]")
 
         # 工具配置
         tools = config.tools.builtin
@@ -163,6 +167,8 @@ class ConfigCommand(Command):
         else:
             tool_status.append("[red]Graph[/red]")
 
-        console.print(f"\n工具组: {' | '.join(tool_status)}")
+        renderables.append(f"\n工具组: {' | '.join(tool_status)}")
+
+        console.print(Group(*renderables))
 
         return True
@@ -1,35 +1,44 @@
-"""配置管理模块"""
+"""配置管理模块
 
-from .settings import Settings, get_settings
-from .prompts import SYSTEM_PROMPTS
-from .modes import (
-    ModeManager,
-    ModeConfig,
-    get_mode_manager,
-    PlanModeValue,
-    PreviewLimitValue,
-    MODE_DEFINITIONS,
-)
-from .schema import (
-    AgentSystemConfig,
-    SubAgentConfig,
-    LLMProfile,
-    LLMConfig,
-    ToolsConfig,
-    HotReloadConfig,
-)
-from .loader import (
-    ConfigLoader,
-    get_config_loader,
-    get_agent_config,
-    reload_agent_config,
-)
-from .watcher import (
-    ConfigWatcher,
-    get_config_watcher,
-    start_config_watcher,
-    stop_config_watcher,
-)
+子模块在首次访问对应名称时才导入，避免只用到其中一部分时
+加载 pydantic_settings、watchdog 等依赖。
+"""
+
+from .._lazy import lazy_exports
+
+# 导出名称 -> 所在子模块
+_EXPORTS = {
+    # 基础配置
+    "Settings": ".settings",
+    "get_settings": ".settings",
+    "SYSTEM_PROMPTS": ".prompts",
+    # 模式管理
+    "ModeManager": ".modes",
+    "ModeConfig": ".modes",
+    "get_mode_manager": ".modes",
+    "PlanModeValue": ".modes",
+    "PreviewLimitValue": ".modes",
+    "MODE_DEFINITIONS": ".modes",
+    # Agent 配置 Schema
+    "AgentSystemConfig": ".schema",
+    "SubAgentConfig": ".schema",
+    "LLMProfile": ".schema",
+    "LLMConfig": ".schema",
+    "ToolsConfig": ".schema",
+    "HotReloadConfig": ".schema",
+    # 配置加载器
+    "ConfigLoader": ".loader",
+    "get_config_loader": ".loader",
+    "get_agent_config": ".loader",
+    "reload_agent_config": ".loader",
+    # 热重载监听
+    "ConfigWatcher": ".watcher",
+    "get_config_watcher": ".watcher",
+    "start_config_watcher": ".watcher",
+    "stop_config_watcher": ".watcher",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     # 基础配置
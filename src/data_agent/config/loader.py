@@ -9,25 +9,57 @@
 5. 热重载回调
 """
 
+import copy
 import logging
 import os
 import re
-import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import yaml
 
+# 优先使用 libyaml 的 C 实现，未编译 libyaml 时回退到纯 Python 版本
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _SafeLoader
+
 from .schema import AgentSystemConfig
 
 logger = logging.getLogger(__name__)
 
+# 环境变量占位符: ${VAR} 或 ${VAR:default}
+_ENV_VAR_RE = re.compile(r"\$\{(\w+)(?::([^}]*))?\}")
+
+# 文件状态标识 (mtime_ns, size)，文件不存在时为 None
+FileStat = Optional[Tuple[int, int]]
+
+
+def _env_replacer(match: "re.Match[str]") -> str:
+    """将 ${VAR} / ${VAR:default} 替换为环境变量值"""
+    value = os.environ.get(match.group(1))
+    if value is not None:
+        return value
+    default = match.group(2)
+    return default if default is not None else ""
+
+
+def _stat_key(path: Path) -> FileStat:
+    """获取文件状态标识，用于判断文件是否变化"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 
 class ConfigLoader:
     """
     配置加载器
 
-    单例模式，负责加载和管理 Agent 系统配置。
+    负责加载和管理 Agent 系统配置，通过 get_config_loader() 获取单例。
 
     使用示例:
         loader = get_config_loader()
@@ -46,33 +78,30 @@ class ConfigLoader:
         Path.home() / ".data_agent" / "agents.yaml",  # 用户自定义配置
     ]
 
-    _instance: Optional["ConfigLoader"] = None
-    _lock = threading.Lock()
-
-    def __new__(cls) -> "ConfigLoader":
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-
     def __init__(self):
-        if self._initialized:
-            return
-
         self._config: Optional[AgentSystemConfig] = None
         self._config_path: Optional[Path] = None
         self._callbacks: List[Callable[[AgentSystemConfig], None]] = []
-        self._initialized = True
-
-        # 初始化时加载配置
-        self.reload()
+        # 上次加载使用的配置文件路径，以及配置/提示词文件的状态
+        self._loaded_path: Optional[Path] = None
+        self._file_stats: Dict[Path, FileStat] = {}
+        # 配置文件解析缓存: (路径, 文件状态, 解析结果)，仅提示词变化时免去 YAML 解析
+        self._yaml_cache: Optional[Tuple[Path, FileStat, Dict[str, Any]]] = None
+        # 提示词缓存: {路径: (文件状态, 内容)}
+        self._prompt_cache: Dict[Path, Tuple[FileStat, str]] = {}
+        # 上次验证的原始配置（环境变量替换后），内容相同时跳过 Pydantic 验证
+        self._raw_config: Optional[Dict[str, Any]] = None
+        # system_prompt 来自提示词文件的配置对象（复用配置时需重新加载）
+        self._prompt_targets: List[Any] = []
 
     def reload(self, config_path: Optional[Path] = None) -> AgentSystemConfig:
         """
         重新加载配置
 
+        配置文件及其引用的提示词文件均未变化（按 mtime 和大小判断）时，
+        直接返回当前配置，不触发重载回调。仅环境变量变化不会被识别，
+        需在某个配置文件变化后的下一次重载才会生效。
+
         Args:
             config_path: 指定配置文件路径，不指定则按优先级查找
 
@@ -85,10 +114,25 @@ class ConfigLoader:
         else:
             self._config_path = self._find_config_file()
 
+        # 配置文件及其引用的提示词文件均未变化时，直接复用已加载的配置
+        if (
+            self._config is not None
+            and self._config_path == self._loaded_path
+            and self._files_unchanged()
+        ):
+            logger.debug("配置文件未变化，跳过重载")
+            return self._config
+
+        self._loaded_path = self._config_path
+        self._file_stats = {}
+
         # 加载配置
         if self._config_path and self._config_path.exists():
             logger.info(f"加载配置文件: {self._config_path}")
-            raw_config = self._load_yaml(self._config_path)
+            # 先记录状态再读取，读取期间的修改会在下次重载时被发现
+            stat = _stat_key(self._config_path)
+            self._file_stats[self._config_path] = stat
+            raw_config = self._load_yaml_cached(self._config_path, stat)
         else:
             logger.info("未找到配置文件，使用默认配置")
             raw_config = {}
@@ -96,13 +140,19 @@ class ConfigLoader:
         # 环境变量替换
         raw_config = self._substitute_env_vars(raw_config)
 
-        # 验证并创建配置对象
-        try:
-            self._config = AgentSystemConfig(**raw_config)
-        except Exception as e:
-            logger.error(f"配置验证失败: {e}")
-            # 使用默认配置
-            self._config = AgentSystemConfig()
+        if self._config is not None and raw_config == self._raw_config:
+            # 配置内容未变（如仅提示词文件变化），复用已验证的配置对象，
+            # 来自文件的提示词在下面重新加载
+            logger.debug("配置内容未变化，跳过验证")
+        else:
+            # 验证并创建配置对象
+            try:
+                self._config = AgentSystemConfig(**raw_config)
+            except Exception as e:
+                logger.error(f"配置验证失败: {e}")
+                # 使用默认配置
+                self._config = AgentSystemConfig()
+            self._raw_config = raw_config
 
         # 加载提示词文件
         self._load_prompt_files()
@@ -112,8 +162,31 @@ class ConfigLoader:
 
         return self._config
 
+    def _files_unchanged(self) -> bool:
+        """检查上次加载涉及的文件是否均未变化"""
+        return all(_stat_key(path) == stat for path, stat in self._file_stats.items())
+
+    def _read_prompt(self, path: Path) -> Optional[str]:
+        """读取提示词文件（按文件状态缓存内容），文件不存在返回 None"""
+        stat = _stat_key(path)
+        self._file_stats[path] = stat
+        if stat is None:
+            return None
+
+        cached = self._prompt_cache.get(path)
+        if cached is not None and cached[0] == stat:
+            return cached[1]
+
+        text = path.read_text(encoding="utf-8")
+        self._prompt_cache[path] = (stat, text)
+        return text
+
     def _find_config_file(self) -> Optional[Path]:
-        """按优先级查找配置文件"""
+        """
+        按优先级查找配置文件
+
+        每次重载都重新查找，运行期间新建的高优先级配置文件也能被发现。
+        """
         # 环境变量指定
         env_path = os.environ.get("DATA_AGENT_CONFIG")
         if env_path:
@@ -122,19 +195,29 @@ class ConfigLoader:
                 return path
             logger.warning(f"环境变量 DATA_AGENT_CONFIG 指定的路径不存在: {env_path}")
 
-        # 按默认路径查找（后面的优先级更高）
-        found_path = None
-        for path in self.DEFAULT_CONFIG_PATHS:
+        # 按默认路径查找（后面的优先级更高，从高到低找到即返回）
+        for path in reversed(self.DEFAULT_CONFIG_PATHS):
             if path.exists():
-                found_path = path
+                return path
+
+        return None
 
-        return found_path
+    def _load_yaml_cached(self, path: Path, stat: FileStat) -> Dict[str, Any]:
+        """
+        加载 YAML 文件，文件状态未变时复用上次的解析结果
+
+        返回深拷贝，因为环境变量替换会原地修改配置。
+        """
+        cached = self._yaml_cache
+        if cached is None or cached[0] != path or cached[1] != stat:
+            cached = self._yaml_cache = (path, stat, self._load_yaml(path))
+        return copy.deepcopy(cached[2])
 
     def _load_yaml(self, path: Path) -> Dict[str, Any]:
         """加载 YAML 文件"""
         try:
             with open(path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or {}
+                return yaml.load(f, Loader=_SafeLoader) or {}
         except yaml.YAMLError as e:
             logger.error(f"YAML 解析错误: {e}")
             return {}
@@ -144,64 +227,88 @@ class ConfigLoader:
 
     def _substitute_env_vars(self, obj: Any) -> Any:
         """
-        递归替换环境变量
+        替换环境变量
 
         支持格式:
         - ${VAR} - 替换为环境变量值，不存在则为空字符串
         - ${VAR:default} - 替换为环境变量值，不存在则使用默认值
+
+        用显式栈迭代遍历，dict/list 原地修改，数字、布尔等叶子节点直接跳过。
         """
         if isinstance(obj, str):
-            # 匹配 ${VAR} 或 ${VAR:default}
-            pattern = r"\$\{(\w+)(?::([^}]*))?\}"
-
-            def replacer(match):
-                var_name = match.group(1)
-                default = match.group(2)
-                value = os.environ.get(var_name)
-                if value is not None:
-                    return value
-                return default if default is not None else ""
-
-            return re.sub(pattern, replacer, obj)
-
-        elif isinstance(obj, dict):
-            return {k: self._substitute_env_vars(v) for k, v in obj.items()}
-
-        elif isinstance(obj, list):
-            return [self._substitute_env_vars(item) for item in obj]
+            # 不含 $ 的字符串不可能有占位符，跳过正则匹配
+            if "$" not in obj:
+                return obj
+            return _ENV_VAR_RE.sub(_env_replacer, obj)
+
+        if not isinstance(obj, (dict, list)):
+            return obj
+
+        stack = [obj]
+        while stack:
+            container = stack.pop()
+            items = container.items() if isinstance(container, dict) else enumerate(container)
+            for key, value in items:
+                if isinstance(value, str):
+                    if "$" in value:
+                        container[key] = _ENV_VAR_RE.sub(_env_replacer, value)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
 
         return obj
 
     def _load_prompt_files(self):
         """加载外部提示词文件"""
+        # 复用配置对象时，上次从文件加载的 system_prompt 需要重新读取
+        loaded = {id(target) for target in self._prompt_targets}
+        self._prompt_targets = []
         if not self._config or not self._config_path:
             return
 
         config_dir = self._config_path.parent
 
-        # 加载子代理提示词
+        # 收集需要加载的提示词: (日志名称, 目标配置对象, 文件路径)
+        tasks = []
         for name, subagent in self._config.subagents.items():
-            if subagent.prompt_file and not subagent.system_prompt:
-                prompt_path = config_dir / subagent.prompt_file
-                if prompt_path.exists():
-                    try:
-                        subagent.system_prompt = prompt_path.read_text(encoding="utf-8")
-                        logger.debug(f"加载子代理 {name} 的提示词: {prompt_path}")
-                    except IOError as e:
-                        logger.warning(f"无法加载提示词文件 {prompt_path}: {e}")
-                else:
-                    logger.warning(f"提示词文件不存在: {prompt_path}")
-
-        # 加载协调者提示词
+            if subagent.prompt_file and (not subagent.system_prompt or id(subagent) in loaded):
+                tasks.append((f"子代理 {name} 的", subagent, config_dir / subagent.prompt_file))
+
         coord = self._config.coordinator
-        if coord.prompt_file and not coord.system_prompt:
-            prompt_path = config_dir / coord.prompt_file
-            if prompt_path.exists():
-                try:
-                    coord.system_prompt = prompt_path.read_text(encoding="utf-8")
-                    logger.debug(f"加载协调者提示词: {prompt_path}")
-                except IOError as e:
-                    logger.warning(f"无法加载提示词文件 {prompt_path}: {e}")
+        if coord.prompt_file and (not coord.system_prompt or id(coord) in loaded):
+            tasks.append(("协调者", coord, config_dir / coord.prompt_file))
+
+        if not tasks:
+            return
+
+        # 文件较多时并发读取（I/O 期间释放 GIL），少量文件直接顺序读取
+        paths = [path for _, _, path in tasks]
+        if len(paths) <= 2:
+            texts = [self._try_read_prompt(path) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+                texts = list(executor.map(self._try_read_prompt, paths))
+
+        # 全部读取完成后再统一赋值：配置对象可能已被其他线程使用，
+        # 读取期间不能出现 system_prompt 为空的中间状态
+        for (label, target, path), text in zip(tasks, texts):
+            if text is not None:
+                target.system_prompt = text
+                self._prompt_targets.append(target)
+                logger.debug(f"加载{label}提示词: {path}")
+            elif id(target) in loaded:
+                # 提示词文件已被删除或无法读取
+                target.system_prompt = None
+
+    def _try_read_prompt(self, path: Path) -> Optional[str]:
+        """读取提示词文件，失败时记录警告并返回 None"""
+        try:
+            text = self._read_prompt(path)
+        except IOError as e:
+            logger.warning(f"无法加载提示词文件 {path}: {e}")
+            return None
+        if text is None:
+            logger.warning(f"提示词文件不存在: {path}")
+        return text
 
     def register_callback(self, callback: Callable[[AgentSystemConfig], None]) -> None:
         """
@@ -234,34 +341,35 @@ class ConfigLoader:
     @property
     def config(self) -> AgentSystemConfig:
         """获取当前配置"""
-        if self._config is None:
-            self.reload()
-        return self._config
+        return self._ensure_loaded()
 
     @property
     def config_path(self) -> Optional[Path]:
-        """获取当前配置文件路径"""
+        """获取当前配置文件路径（首次访问时加载配置）"""
+        self._ensure_loaded()
         return self._config_path
 
+    def _ensure_loaded(self) -> AgentSystemConfig:
+        """首次使用时加载配置"""
+        if self._config is None:
+            self.reload()
+        return self._config
+
     def has_custom_config(self) -> bool:
         """检查是否有自定义配置文件"""
+        self._ensure_loaded()
         return self._config_path is not None and self._config_path.exists()
 
     def has_subagents_config(self) -> bool:
         """检查是否配置了子代理"""
-        return bool(self._config and self._config.subagents)
+        return bool(self.config.subagents)
 
 
 # 全局单例访问函数
-_loader: Optional[ConfigLoader] = None
-
-
+@cache
 def get_config_loader() -> ConfigLoader:
     """获取配置加载器单例"""
-    global _loader
-    if _loader is None:
-        _loader = ConfigLoader()
-    return _loader
+    return ConfigLoader()
 
 
 def get_agent_config() -> AgentSystemConfig:
@@ -7,10 +7,11 @@
 import json
 import os
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PlanModeValue(str, Enum):
@@ -37,6 +38,9 @@ class PreviewLimitValue(str, Enum):
 class ModeConfig(BaseModel):
     """运行时模式配置"""
 
+    # 赋值时不做验证：ModeManager 写入前已完成类型转换
+    model_config = ConfigDict(validate_assignment=False, use_enum_values=False)
+
     # 核心模式
     plan_mode: PlanModeValue = Field(
         default=PlanModeValue.OFF,
@@ -65,8 +69,9 @@ class ModeConfig(BaseModel):
         description="自动导出：是否自动保存结果到文件"
     )
 
-    class Config:
-        use_enum_values = False
+
+# 默认模式配置，重置时复制而无需重新验证
+_DEFAULT_CONFIG = ModeConfig()
 
 
 # 模式定义信息
@@ -115,76 +120,165 @@ MODE_DEFINITIONS: Dict[str, Dict[str, Any]] = {
     },
 }
 
+# 模式键 -> ModeConfig 字段名
+_MODE_ATTR: Dict[str, str] = {key: d["attr"] for key, d in MODE_DEFINITIONS.items()}
+
+# 环境变量名 -> ModeConfig 字段名
+_ENV_ATTR: Dict[str, str] = {
+    d["env_key"]: d["attr"] for d in MODE_DEFINITIONS.values() if d.get("env_key")
+}
+
+# 模式状态表的静态部分: (命令, 字段名, 说明)
+_DISPLAY_ROWS: Tuple[Tuple[str, str, str], ...] = tuple(
+    (f"/{key}", d["attr"], d["description"]) for key, d in MODE_DEFINITIONS.items()
+)
+_BOOL_DISPLAY = {True: "[green]ON[/green]", False: "[red]OFF[/red]"}
+
+# 字符串值 -> 枚举成员
+_PLAN_MODES: Dict[str, PlanModeValue] = {m.value: m for m in PlanModeValue}
+_PREVIEW_LIMITS: Dict[str, PreviewLimitValue] = {m.value: m for m in PreviewLimitValue}
+
+
+def _to_bool(value: Any) -> Any:
+    """布尔值转换"""
+    if isinstance(value, str):
+        return value.lower() in ("on", "true", "1", "yes")
+    return value
+
+
+def _to_plan_mode(value: Any) -> Any:
+    """计划模式值转换"""
+    if isinstance(value, str):
+        return _PLAN_MODES[value.lower()]
+    return value
+
+
+def _to_preview_limit(value: Any) -> Any:
+    """预览行数值转换"""
+    if isinstance(value, str):
+        return _PREVIEW_LIMITS[value]
+    return value
+
+
+# 字段名 -> 值转换函数，未列出的字段按布尔值处理
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "plan_mode": _to_plan_mode,
+    "preview_limit": _to_preview_limit,
+}
+
 
 class ModeManager:
     """
     模式管理器
 
     负责模式的读取、修改、持久化和状态显示。
-    使用单例模式确保全局状态一致。
+    通过 get_mode_manager() 获取全局单例，确保全局状态一致。
     """
 
-    _instance: Optional["ModeManager"] = None
     _config_file: Path = Path.home() / ".data_agent" / "modes.json"
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    # 设置后直接从该环境变量读取 modes.json 内容，不读写文件（适用于只读容器）
+    _CONFIG_JSON_ENV = "DATA_AGENT_CONFIG_JSON"
+    # 已解析的配置文件缓存: {路径: (mtime_ns, 数据)}，文件未变时跳过 json 解析
+    _file_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
 
     def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
         self._config = ModeConfig()
         self._callbacks: Dict[str, List[Callable]] = {}
+        # 上次写入配置文件的内容及写入后的 mtime_ns
+        self._last_write: Optional[Tuple[bytes, int]] = None
         self._load_from_file()
         self._load_from_env()
 
     def _load_from_file(self) -> None:
-        """从 JSON 文件加载配置"""
-        if self._config_file.exists():
-            try:
-                with open(self._config_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    # 转换枚举值
-                    if "plan_mode" in data:
-                        data["plan_mode"] = PlanModeValue(data["plan_mode"])
-                    if "preview_limit" in data:
-                        data["preview_limit"] = PreviewLimitValue(data["preview_limit"])
-                    self._config = ModeConfig(**data)
-            except Exception:
-                pass  # 加载失败使用默认值
+        """从 JSON 文件（或 DATA_AGENT_CONFIG_JSON 环境变量）加载配置"""
+        try:
+            env_blob = os.environ.get(self._CONFIG_JSON_ENV)
+            if env_blob is not None:
+                parsed = json.loads(env_blob)
+            else:
+                parsed = self._read_config_file()
+                if parsed is None:
+                    return  # 文件不存在，使用默认值
+            # 转换枚举值（生成新字典，不修改缓存内容）
+            data = {
+                attr: _COERCERS[attr](value) if attr in _COERCERS else value
+                for attr, value in parsed.items()
+            }
+            self._config = ModeConfig(**data)
+        except Exception:
+            pass  # 加载失败使用默认值
+
+    def _read_config_file(self) -> Optional[Dict[str, Any]]:
+        """读取并解析配置文件，文件未变化时返回缓存结果；文件不存在返回 None"""
+        try:
+            mtime = self._config_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        path = str(self._config_file)
+        cached = self._file_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(self._config_file, "r", encoding="utf-8") as f:
+            parsed = json.load(f)
+        self._file_cache[path] = (mtime, parsed)
+        return parsed
 
     def _load_from_env(self) -> None:
         """从环境变量加载配置（优先级高于文件）"""
-        for mode_key, definition in MODE_DEFINITIONS.items():
-            env_key = definition.get("env_key")
-            if env_key and env_key in os.environ:
-                value = os.environ[env_key]
-                self._set_mode_internal(mode_key, value)
+        env = os.environ
+        updates = {}
+        for env_key in _ENV_ATTR.keys() & env.keys():
+            attr = _ENV_ATTR[env_key]
+            try:
+                updates[attr] = _COERCERS.get(attr, _to_bool)(env[env_key])
+            except (ValueError, KeyError):
+                continue  # 无效值忽略
+
+        if updates:
+            # 一次性应用所有环境变量覆盖
+            self._config = self._config.model_copy(update=updates)
 
     def _save_to_file(self) -> None:
         """保存配置到 JSON 文件"""
+        if self._CONFIG_JSON_ENV in os.environ:
+            return  # 配置来自环境变量，不写文件
+
         self._config_file.parent.mkdir(parents=True, exist_ok=True)
         data = {}
-        for mode_key, definition in MODE_DEFINITIONS.items():
-            attr = definition["attr"]
+        for attr in _MODE_ATTR.values():
             value = getattr(self._config, attr)
             # 转换枚举为字符串
             if isinstance(value, Enum):
                 value = value.value
             data[attr] = value
 
-        with open(self._config_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        if self._last_write is not None and self._last_write[0] == payload:
+            # 内容与上次写入相同，且文件此后未被其他进程（如 API 服务）修改，无需再写
+            try:
+                if self._config_file.stat().st_mtime_ns == self._last_write[1]:
+                    return
+            except OSError:
+                pass
+
+        # 先写临时文件再替换，一次写入且不会留下写了一半的配置文件
+        tmp_file = self._config_file.with_suffix(".json.tmp")
+        with open(tmp_file, "wb", buffering=0) as f:
+            f.write(payload)
+        os.replace(tmp_file, self._config_file)
+        mtime = self._config_file.stat().st_mtime_ns
+        self._last_write = (payload, mtime)
+
+        # 刷新解析缓存，下次加载无需重新读取刚写入的文件
+        self._file_cache[str(self._config_file)] = (mtime, data)
 
     def get(self, mode_key: str) -> Any:
         """获取模式值"""
-        if mode_key not in MODE_DEFINITIONS:
+        attr = _MODE_ATTR.get(mode_key)
+        if attr is None:
             raise ValueError(f"未知的模式: {mode_key}")
-        attr = MODE_DEFINITIONS[mode_key]["attr"]
         return getattr(self._config, attr)
 
     def set(self, mode_key: str, value: Any, persist: bool = True) -> bool:
@@ -199,47 +293,40 @@ class ModeManager:
         Returns:
             是否设置成功
         """
-        if mode_key not in MODE_DEFINITIONS:
+        if mode_key not in _MODE_ATTR:
             return False
 
         old_value = self.get(mode_key)
-        success = self._set_mode_internal(mode_key, value)
+        if not self._set_mode_internal(mode_key, value):
+            return False
 
-        if success:
-            if persist:
-                self._save_to_file()
-            # 触发回调
-            self._trigger_callbacks(mode_key, old_value, self.get(mode_key))
+        new_value = self.get(mode_key)
+        if new_value == old_value:
+            return True  # 值未变化，无需保存和触发回调
 
-        return success
+        if persist:
+            self._save_to_file()
+        # 触发回调
+        self._trigger_callbacks(mode_key, old_value, new_value)
+        return True
 
     def _set_mode_internal(self, mode_key: str, value: Any) -> bool:
         """内部设置模式值"""
-        definition = MODE_DEFINITIONS[mode_key]
-        attr = definition["attr"]
+        attr = _MODE_ATTR[mode_key]
 
         try:
-            if attr == "plan_mode":
-                if isinstance(value, str):
-                    value = PlanModeValue(value.lower())
-            elif attr == "preview_limit":
-                if isinstance(value, str):
-                    value = PreviewLimitValue(value)
-            elif isinstance(value, str):
-                # 布尔值转换
-                value = value.lower() in ("on", "true", "1", "yes")
-
-            setattr(self._config, attr, value)
+            # 值已转换为字段类型，赋值时无需再验证（validate_assignment=False）
+            setattr(self._config, attr, _COERCERS.get(attr, _to_bool)(value))
             return True
         except (ValueError, KeyError):
             return False
 
     def toggle(self, mode_key: str) -> Any:
         """切换布尔模式"""
-        if mode_key not in MODE_DEFINITIONS:
+        attr = _MODE_ATTR.get(mode_key)
+        if attr is None:
             return None
 
-        attr = MODE_DEFINITIONS[mode_key]["attr"]
         current = getattr(self._config, attr)
 
         if isinstance(current, bool):
@@ -281,37 +368,33 @@ class ModeManager:
         table.add_column("当前值", style="green", width=10)
         table.add_column("说明", style="dim")
 
-        for mode_key, definition in MODE_DEFINITIONS.items():
-            value = self.get(mode_key)
-            # 格式化显示值
+        config = self._config
+        for command, attr, description in _DISPLAY_ROWS:
+            value = getattr(config, attr)
+            # 格式化显示值（只有当前值需要每次生成）
             if isinstance(value, bool):
-                display_value = "[green]ON[/green]" if value else "[red]OFF[/red]"
+                display_value = _BOOL_DISPLAY[value]
             elif isinstance(value, Enum):
                 display_value = f"[yellow]{value.value}[/yellow]"
             else:
                 display_value = str(value)
 
-            table.add_row(
-                f"/{mode_key}",
-                display_value,
-                definition["description"]
-            )
+            table.add_row(command, display_value, description)
 
         console.print(Panel(table, border_style="blue"))
 
     def reset_to_defaults(self) -> None:
         """重置所有模式为默认值"""
-        self._config = ModeConfig()
+        self._config = _DEFAULT_CONFIG.model_copy()
         self._save_to_file()
 
     def get_all(self) -> Dict[str, Any]:
         """获取所有模式的当前值"""
-        result = {}
-        for mode_key in MODE_DEFINITIONS:
-            result[mode_key] = self.get(mode_key)
-        return result
+        config = self._config
+        return {mode_key: getattr(config, attr) for mode_key, attr in _MODE_ATTR.items()}
 
 
+@lru_cache(maxsize=1)
 def get_mode_manager() -> ModeManager:
     """获取模式管理器单例"""
     return ModeManager()
@@ -5,8 +5,8 @@
 """
 
 import os
-from functools import lru_cache
-from typing import Optional
+from functools import cached_property
+from typing import Iterator, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -129,38 +129,46 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         extra = "ignore"
 
-    def validate_config(self) -> list[str]:
-        """验证配置，返回错误列表"""
-        errors = []
-
+    def validate_config(self) -> Iterator[str]:
+        """验证配置，逐个产出错误信息"""
         if not self.api_key:
-            errors.append("缺少模型 API 密钥 (API_KEY)")
+            yield "缺少模型 API 密钥 (API_KEY)"
 
         if not self.db_connection:
-            errors.append("缺少数据库连接字符串 (DB_CONNECTION)")
-
-        return errors
+            yield "缺少数据库连接字符串 (DB_CONNECTION)"
 
-    def get_db_type(self) -> str:
-        """获取数据库类型"""
-        if not self.db_connection:
+    @cached_property
+    def db_type(self) -> str:
+        """数据库类型（根据连接字符串判断，首次访问后缓存）"""
+        conn = self.db_connection.lower()
+        if not conn:
             return "unknown"
-        if "mysql" in self.db_connection.lower():
+        if "mysql" in conn:
             return "mysql"
-        elif "postgresql" in self.db_connection.lower() or "postgres" in self.db_connection.lower():
+        elif "postgres" in conn:
             return "postgresql"
-        elif "sqlite" in self.db_connection.lower():
+        elif "sqlite" in conn:
             return "sqlite"
         return "unknown"
 
+    def get_db_type(self) -> str:
+        """获取数据库类型"""
+        return self.db_type
+
+
+_settings: Optional[Settings] = None
+
 
-@lru_cache()
 def get_settings() -> Settings:
     """获取配置单例"""
-    return Settings()
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
 
 
 def reload_settings() -> Settings:
     """重新加载配置"""
-    get_settings.cache_clear()
+    global _settings
+    _settings = None
     return get_settings()
@@ -6,7 +6,9 @@
 """
 
 import logging
+import os
 import threading
+import time
 from pathlib import Path
 from typing import Callable, List, Optional
 
@@ -15,17 +17,57 @@ logger = logging.getLogger(__name__)
 # watchdog 是可选依赖
 try:
     from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler, FileModifiedEvent
+    from watchdog.observers.polling import PollingObserver
+    from watchdog.events import PatternMatchingEventHandler
 
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
     Observer = None
-    FileSystemEventHandler = object
+    PollingObserver = None
+    PatternMatchingEventHandler = object
 
+# 需要触发重载的配置文件，以及要忽略的隐藏文件（编辑器锁文件、交换文件等）
+_CONFIG_PATTERNS = ["*.yaml", "*.yml", "*.md"]
+_IGNORE_PATTERNS = [".*"]
 
-class ConfigFileHandler(FileSystemEventHandler):
-    """配置文件变更处理器"""
+# 收不到 inotify 事件的文件系统（网络/共享挂载，宿主机上的修改不会通知到容器内）
+_POLLING_FS_TYPES = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "vboxsf", "virtiofs",
+    "fuse.sshfs", "fuse.grpcfuse",
+})
+# 轮询间隔（秒）
+_POLL_INTERVAL = 2.0
+
+
+def _needs_polling(paths: List[Path]) -> bool:
+    """是否需要轮询监听：设置了 DATA_AGENT_POLL，或有目录位于网络/共享文件系统"""
+    if os.environ.get("DATA_AGENT_POLL", "").lower() in ("1", "true", "yes", "on"):
+        return True
+
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False  # 非 Linux 系统，使用默认 Observer
+
+    for path in paths:
+        path_str = str(path)
+        # 取最长匹配的挂载点作为该目录所在的文件系统
+        best_point, best_type = "", ""
+        for mount_point, fs_type in mounts:
+            if len(mount_point) > len(best_point) and (
+                path_str == mount_point
+                or path_str.startswith(mount_point.rstrip("/") + "/")
+            ):
+                best_point, best_type = mount_point, fs_type
+        if best_type in _POLLING_FS_TYPES:
+            return True
+    return False
+
+
+class ConfigFileHandler(PatternMatchingEventHandler):
+    """配置文件变更处理器（文件过滤由 watchdog 在分发事件前完成）"""
 
     def __init__(self, callback: Callable, debounce_ms: int = 1000):
         """
@@ -35,44 +77,59 @@ class ConfigFileHandler(FileSystemEventHandler):
             callback: 文件变更时的回调函数
             debounce_ms: 防抖延迟（毫秒）
         """
+        super().__init__(
+            patterns=_CONFIG_PATTERNS,
+            ignore_patterns=_IGNORE_PATTERNS,
+            ignore_directories=True,
+        )
         self.callback = callback
         self.debounce_ms = debounce_ms
-        self._timer: Optional[threading.Timer] = None
-        self._lock = threading.Lock()
+        # 防抖截止时间（time.monotonic），每个新事件都会推迟它
+        self._deadline = 0.0
+        self._wake = threading.Event()
+        self._closed = False
+        # 常驻的防抖线程，避免每个事件都创建/取消一个 Timer 线程
+        self._worker = threading.Thread(
+            target=self._run, name="config-reload-debounce", daemon=True
+        )
+        self._worker.start()
 
     def on_modified(self, event):
         """文件修改事件处理"""
-        if event.is_directory:
-            return
-
-        # 只处理 .yaml, .yml, .md 文件
-        path = Path(event.src_path)
-        if path.suffix not in (".yaml", ".yml", ".md"):
-            return
-
-        logger.debug(f"检测到配置文件变更: {path}")
+        logger.debug("检测到配置文件变更: %s", event.src_path)
         self._debounced_callback()
 
     def on_created(self, event):
         """文件创建事件处理"""
-        if event.is_directory:
-            return
-
-        path = Path(event.src_path)
-        if path.suffix in (".yaml", ".yml", ".md"):
-            logger.debug(f"检测到配置文件创建: {path}")
-            self._debounced_callback()
+        logger.debug("检测到配置文件创建: %s", event.src_path)
+        self._debounced_callback()
 
     def _debounced_callback(self):
-        """防抖处理"""
-        with self._lock:
-            if self._timer:
-                self._timer.cancel()
-
-            self._timer = threading.Timer(
-                self.debounce_ms / 1000, self._execute_callback
-            )
-            self._timer.start()
+        """防抖处理：推迟截止时间并唤醒防抖线程"""
+        # 只有 watchdog 的分发线程写入截止时间，float 赋值本身是原子的，无需加锁
+        self._deadline = time.monotonic() + self.debounce_ms / 1000
+        self._wake.set()
+
+    def _run(self):
+        """防抖线程：最后一个事件之后静默 debounce_ms 才执行回调"""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            # 等待期间到达的新事件会推迟截止时间，醒来后重新计算剩余时间
+            while not self._closed:
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wake.wait(remaining)
+                self._wake.clear()
+            if self._closed:
+                return
+            self._execute_callback()
+
+    def close(self):
+        """停止防抖线程，尚未执行的回调将被丢弃"""
+        self._closed = True
+        self._wake.set()
 
     def _execute_callback(self):
         """执行回调"""
@@ -133,11 +190,8 @@ class ConfigWatcher:
         if self._running:
             self.stop()
 
-        self._observer = Observer()
-        handler = ConfigFileHandler(callback, debounce_ms)
-        self._handlers.append(handler)
-
-        watched_count = 0
+        # 递归监听的目录，已被上层目录覆盖的路径不再重复监听
+        watch_dirs: List[Path] = []
         for path_str in watch_paths:
             path = Path(path_str)
 
@@ -152,18 +206,33 @@ class ConfigWatcher:
                     # 使用默认配置目录
                     path = Path(__file__).parent / path
 
-            if path.exists():
-                watch_dir = path if path.is_dir() else path.parent
-                self._observer.schedule(handler, str(watch_dir), recursive=True)
-                logger.info(f"开始监听配置文件: {watch_dir}")
-                watched_count += 1
-            else:
+            if not path.exists():
                 logger.warning(f"监听路径不存在: {path}")
+                continue
+
+            watch_dir = (path if path.is_dir() else path.parent).resolve()
+            if any(d == watch_dir or d in watch_dir.parents for d in watch_dirs):
+                continue
+            # 新目录覆盖了之前加入的子目录时，移除这些子目录
+            watch_dirs = [d for d in watch_dirs if watch_dir not in d.parents]
+            watch_dirs.append(watch_dir)
 
-        if watched_count == 0:
+        if not watch_dirs:
             logger.warning("没有有效的监听路径")
             return False
 
+        if _needs_polling(watch_dirs):
+            logger.info("使用轮询方式监听配置文件")
+            self._observer = PollingObserver(timeout=_POLL_INTERVAL)
+        else:
+            self._observer = Observer()
+        handler = ConfigFileHandler(callback, debounce_ms)
+        self._handlers.append(handler)
+
+        for watch_dir in watch_dirs:
+            self._observer.schedule(handler, str(watch_dir), recursive=True)
+            logger.info(f"开始监听配置文件: {watch_dir}")
+
         self._observer.start()
         self._running = True
         logger.info("配置热重载监听已启动")
@@ -176,6 +245,8 @@ class ConfigWatcher:
             self._observer.join(timeout=5)
             self._observer = None
 
+        for handler in self._handlers:
+            handler.close()
         self._handlers.clear()
         self._running = False
         logger.info("配置热重载监听已停止")
@@ -9,14 +9,12 @@ import sys
 import signal
 import logging
 import atexit
+from typing import Optional
 
 from rich.console import Console
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.table import Table
 
 from .agent.deep_agent import DataAgent
-from .config.settings import get_settings
+from .config.settings import Settings, get_settings
 from .config.modes import get_mode_manager
 from .commands import register_all_commands
 from .ui import StepPager
@@ -44,19 +42,20 @@ def setup_langsmith():
 # 初始化 LangSmith（必须在导入 LangChain 相关模块之前）
 _langsmith_enabled = setup_langsmith()
 
-# 配置日志
-_settings = get_settings()
-_log_level = getattr(logging, _settings.log_level.upper(), logging.WARNING)
-logging.basicConfig(
-    level=_log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-
 logger = logging.getLogger(__name__)
 
 
+def _configure_logging(settings: Settings):
+    """配置日志（在 main() 中调用，仅导入模块时不做配置）"""
+    log_level = getattr(logging, settings.log_level.upper(), logging.WARNING)
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
 def _cleanup_on_exit():
     """程序退出时的清理函数"""
     # 强制关闭所有 asyncio 事件循环相关资源
@@ -93,6 +92,9 @@ _setup_signal_handlers()
 
 def print_welcome(console: Console):
     """打印欢迎信息"""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
     welcome_text = """
 # 数据分析 Agent
 
@@ -121,9 +123,11 @@ def print_welcome(console: Console):
     console.print(Panel(Markdown(welcome_text), title="Data Agent", border_style="blue"))
 
 
-def print_config(console: Console):
+def print_config(console: Console, settings: Optional[Settings] = None):
     """打印配置信息"""
-    settings = get_settings()
+    from rich.table import Table
+
+    settings = settings or get_settings()
 
     config_table = Table(title="配置信息")
     config_table.add_column("配置项", style="cyan")
@@ -138,15 +142,17 @@ def print_config(console: Console):
     console.print(config_table)
 
 
-def validate_config(console: Console) -> bool:
+def validate_config(console: Console, settings: Optional[Settings] = None) -> bool:
     """验证配置"""
-    settings = get_settings()
-    errors = settings.validate_config()
-
-    if errors:
-        console.print("[red]配置错误:[/red]")
-        for error in errors:
-            console.print(f"  - {error}")
+    settings = settings or get_settings()
+    has_errors = False
+    for error in settings.validate_config():
+        if not has_errors:
+            console.print("[red]配置错误:[/red]")
+            has_errors = True
+        console.print(f"  - {error}")
+
+    if has_errors:
         console.print("\n请检查.env文件或环境变量配置。")
         return False
 
@@ -162,6 +168,8 @@ def main():
     - 支持斜杠命令
     - 输入 exit 退出程序
     """
+    settings = get_settings()
+    _configure_logging(settings)
     console = Console()
 
     # 注册所有命令
@@ -172,7 +180,7 @@ def main():
     print_welcome(console)
 
     # 验证配置
-    if not validate_config(console):
+    if not validate_config(console, settings):
         console.print("\n[yellow]警告: 配置不完整，部分功能可能不可用。[/yellow]")
 
     # 显示当前模式状态
@@ -186,7 +194,6 @@ def main():
     try:
         agent = DataAgent(console=console)
         if _langsmith_enabled:
-            settings = get_settings()
             console.print(f"[dim]LangSmith: 已启用 (项目: {settings.langsmith_project})[/dim]")
     except Exception as e:
         console.print(f"[red]Agent 初始化失败: {e}[/red]")
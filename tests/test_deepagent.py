@@ -137,6 +137,99 @@ class TestConfigImport:
         assert "ml" in SYSTEM_PROMPTS
 
 
+def _bump_mtime(path):
+    """推后文件 mtime，避免同一时间戳内的连续写入被视为未变化"""
+    import os
+
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestConfigLoaderReload:
+    """测试配置重载的变化检测"""
+
+    @pytest.fixture
+    def config_dir(self, tmp_path):
+        (tmp_path / "agents.yaml").write_text(
+            "subagents:\n"
+            "  analyst:\n"
+            "    description: ${ANALYST_DESC:分析}\n"
+            "    prompt_file: analyst.md\n"
+            "    tools: []\n",
+            encoding="utf-8",
+        )
+        (tmp_path / "analyst.md").write_text("v1", encoding="utf-8")
+        return tmp_path
+
+    @pytest.fixture
+    def loader(self, config_dir):
+        from data_agent.config.loader import ConfigLoader
+
+        loader = ConfigLoader()
+        loader.reload(config_dir / "agents.yaml")
+        return loader
+
+    def test_reload_skipped_when_unchanged(self, loader, config_dir):
+        """文件均未变化时跳过重载，不触发回调"""
+        callback = MagicMock()
+        loader.register_callback(callback)
+        config = loader.config
+
+        with patch.object(loader, "_load_yaml", wraps=loader._load_yaml) as load_yaml:
+            assert loader.reload(config_dir / "agents.yaml") is config
+
+        load_yaml.assert_not_called()
+        callback.assert_not_called()
+
+    def test_prompt_change_reuses_yaml(self, loader, config_dir):
+        """仅提示词文件变化时更新提示词，不重新解析 YAML"""
+        callback = MagicMock()
+        loader.register_callback(callback)
+        config = loader.config
+
+        prompt = config_dir / "analyst.md"
+        prompt.write_text("v2", encoding="utf-8")
+        _bump_mtime(prompt)
+
+        with patch.object(loader, "_load_yaml", wraps=loader._load_yaml) as load_yaml:
+            reloaded = loader.reload(config_dir / "agents.yaml")
+
+        load_yaml.assert_not_called()
+        assert reloaded is config
+        assert reloaded.subagents["analyst"].system_prompt == "v2"
+        callback.assert_called_once_with(reloaded)
+
+    def test_yaml_change_creates_new_config(self, loader, config_dir):
+        """配置文件变化时重新解析并生成新的配置对象"""
+        config = loader.config
+
+        config_file = config_dir / "agents.yaml"
+        config_file.write_text(
+            config_file.read_text(encoding="utf-8").replace("${ANALYST_DESC:分析}", "统计"),
+            encoding="utf-8",
+        )
+        _bump_mtime(config_file)
+
+        reloaded = loader.reload(config_file)
+        assert reloaded is not config
+        assert reloaded.subagents["analyst"].description == "统计"
+        assert reloaded.subagents["analyst"].system_prompt == "v1"
+
+    def test_env_change_needs_file_change(self, loader, config_dir, monkeypatch):
+        """仅环境变量变化不会重载，配置文件变化后才生效"""
+        callback = MagicMock()
+        loader.register_callback(callback)
+        config_file = config_dir / "agents.yaml"
+
+        monkeypatch.setenv("ANALYST_DESC", "来自环境变量")
+        assert loader.reload(config_file).subagents["analyst"].description == "分析"
+        callback.assert_not_called()
+
+        _bump_mtime(config_file)
+        assert loader.reload(config_file).subagents["analyst"].description == "来自环境变量"
+        callback.assert_called_once()
+
+
 class TestMainEntry:
     """测试主入口"""
 
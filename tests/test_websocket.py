@@ -0,0 +1,144 @@
+"""
+WebSocket 事件发送测试
+
+使用桩 Agent 驱动 process_user_message，验证事件合并为 batch 帧的协议：
+- 单帧最多合并 _MAX_BATCH_EVENTS 个事件
+- done 事件结束当前帧和发送循环
+- 合并过程中遇到取消信号（None）时结束发送循环
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from data_agent.api import websocket as ws
+
+
+class FakeWebSocket:
+    """记录已发送帧的 WebSocket"""
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text: str):
+        self.frames.append(json.loads(text))
+
+
+class InlineThread:
+    """在当前线程内同步执行聊天，使全部事件在发送循环读取前入队"""
+
+    def __init__(self, target, daemon=None):
+        self._target = target
+
+    def start(self):
+        self._target()
+
+    def join(self, timeout=None):
+        pass
+
+
+def _frame_types(frame):
+    """帧内事件类型列表（非 batch 帧视为单个事件）"""
+    if frame["type"] == "batch":
+        return [event["type"] for event in frame["events"]]
+    return [frame["type"]]
+
+
+async def _run(chat_stream, sess=None):
+    """用桩 Agent 处理一条消息，返回发送的帧"""
+    sess = sess or ws.Session("test")
+    agent = MagicMock()
+    agent.chat_stream.side_effect = lambda message, on_thinking, **kwargs: chat_stream(
+        sess, on_thinking
+    )
+    sess.agent = agent
+
+    websocket = FakeWebSocket()
+    with patch.object(ws.threading, "Thread", InlineThread):
+        await ws.process_user_message(websocket, sess, "hi")
+    return websocket.frames
+
+
+def _post(sess, event):
+    """与 emit 一样经由事件循环投递，保持与其他事件的顺序"""
+    asyncio.get_running_loop().call_soon_threadsafe(sess.events.put_nowait, event)
+
+
+class TestWebSocketBatching:
+    """测试事件合并发送"""
+
+    @pytest.mark.asyncio
+    async def test_batch_size_capped(self):
+        """超过上限的事件拆分为多个 batch 帧"""
+        def chat_stream(sess, on_thinking):
+            for i in range(40):
+                on_thinking(str(i))
+            return "ok"
+
+        frames = await _run(chat_stream)
+
+        # 40 条思考 + message + done
+        assert [len(_frame_types(f)) for f in frames] == [16, 16, 10]
+        assert all(f["type"] == "batch" for f in frames)
+        assert _frame_types(frames[-1])[-2:] == ["message", "done"]
+        thinking = [e["content"] for f in frames for e in f["events"] if e["type"] == "thinking"]
+        assert thinking == [str(i) for i in range(40)]
+
+    @pytest.mark.asyncio
+    async def test_done_ends_batch(self):
+        """done 之后的事件不再合并或发送"""
+        def chat_stream(sess, on_thinking):
+            on_thinking("a")
+            on_thinking("b")
+            _post(sess, {"type": "done"})
+            on_thinking("c")
+            return "ok"
+
+        frames = await _run(chat_stream)
+
+        assert len(frames) == 1
+        assert _frame_types(frames[0]) == ["thinking", "thinking", "done"]
+
+    @pytest.mark.asyncio
+    async def test_cancel_sentinel_stops_loop(self):
+        """合并过程中遇到 None 时，发送已合并的事件后结束循环"""
+        def chat_stream(sess, on_thinking):
+            for content in ("a", "b", "c"):
+                on_thinking(content)
+            _post(sess, None)
+            on_thinking("d")
+            return "ok"
+
+        frames = await _run(chat_stream)
+
+        assert len(frames) == 1
+        assert _frame_types(frames[0]) == ["thinking", "thinking", "thinking"]
+
+
+
+class TestWebSocketSessionState:
+    """测试会话状态的归属"""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_turn_keeps_new_turn_state(self):
+        """被取消的一轮结束时，不清除已开始的新一轮的事件队列和处理标志"""
+        sess = ws.Session("test")
+        new_queue = asyncio.Queue()
+
+        def chat_stream(sess, on_thinking):
+            # 模拟取消后客户端立即发起新一轮
+            _post(sess, None)
+            sess.events = new_queue
+            sess.processing = True
+            return "ok"
+
+        await _run(chat_stream, sess)
+
+        assert sess.events is new_queue
+        assert sess.processing is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -51,7 +51,7 @@ const { Text, Title } = Typography;
 interface ConfirmationRequest {
   tool_name: string;
   args: Record<string, unknown>;
-  tool_call_id: string;
+  tool_call_id: number;
   description: string;
 }
 
@@ -147,7 +147,7 @@ export function ChatSidebar() {
         setPendingConfirmation({
           tool_name: data.tool_name as string,
           args: data.args as Record<string, unknown>,
-          tool_call_id: data.tool_call_id as string,
+          tool_call_id: data.tool_call_id as number,
           description: data.description as string,
         });
         setEditedArgs(JSON.stringify(data.args, null, 2));
@@ -239,7 +239,14 @@ export function ChatSidebar() {
     ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
-        handleServerMessage(data);
+        if (data.type === "batch") {
+          // 服务端合并发送的多个事件，逐个分发
+          for (const item of data.events as Record<string, unknown>[]) {
+            handleServerMessage(item);
+          }
+        } else {
+          handleServerMessage(data);
+        }
       } catch (e) {
         console.error("Failed to parse WebSocket message:", e);
       }